@@ -1,8 +1,10 @@
 # import
+import asyncio
 import datetime
 from typing import List, Optional
 import os
 
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
@@ -10,7 +12,8 @@ from pydantic import BaseModel, Field
 
 # 커스텀 모듈
 from .module.embedding import Embedding
-from .module.sqlitevec import SQLiteVecDB, get_sqlite_db_path
+from .module.semcache import SemanticCache
+from .module.sqlitevec import SQLiteVecDB, HNSWVecDB, get_sqlite_db_path
 
 
 ################################
@@ -42,12 +45,24 @@ SERVER_TIMEZONE = str(datetime.datetime.now().astimezone().tzinfo)
 # 벡터 DB 클래스 변수
 VECTOR_DB = None
 DB_NAME = None
+EMBEDDING = None
+
+# 검색 응답 캐시 유지 시간(초). DB가 바뀐 뒤 이 시간이 지나면 캐시된 이전 응답을 반환하지 않음
+SEARCH_CACHE_TTL = 600
+
+# 동일한 (쿼리, k) 요청에 대한 검색 응답 캐시 (최대 1024개, 10분 유지)
+SEARCH_CACHE = TTLCache(maxsize=1024, ttl=SEARCH_CACHE_TTL)
+SEARCH_CACHE_LOCK = asyncio.Lock()
+
+# 의미가 거의 같은 쿼리(코사인 유사도 0.95 이상)에 대한 검색 응답 캐시 (SEARCH_CACHE와 같이 10분 유지)
+SEMANTIC_CACHE = SemanticCache(max_size=10000, threshold=0.95, ttl=SEARCH_CACHE_TTL)
 
 @app.on_event("startup")
 async def startup_event():
     """앱 시작 시 벡터 데이터베이스를 초기화함"""
     global VECTOR_DB
     global DB_NAME
+    global EMBEDDING
     
     try:
         # API 키 가져옴
@@ -58,24 +73,48 @@ async def startup_event():
         # 임베딩 모델 초기화함
         embedding_source = os.getenv("EMBEDDING_SOURCE", "google")
         embedding_model = os.getenv("EMBEDDING_MODEL", "models/text-embedding-004")
-        embedding = Embedding(api_key=api_key, source=embedding_source, model=embedding_model)
+        # 임베딩 API 동시 요청 수는 전체 워커 합계 기준이므로 워커 수로 나눠 워커별 한도를 정함
+        # (RAG_API_WORKERS는 run_production.py가 설정함. run_dev.py 등 단일 프로세스 실행 시에는 1)
+        workers = int(os.getenv("RAG_API_WORKERS", "1"))
+        max_in_flight = max(1, int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "5")) // workers)
+        embedding = Embedding(api_key=api_key, source=embedding_source, model=embedding_model, max_in_flight=max_in_flight)
+        embedding.get_langchain_embeddings()  # 사용하는 제공자 패키지만 불러오고 클라이언트를 미리 생성함
         
         # SQLite 데이터베이스 경로 가져옴
         db_name = os.getenv("RAG_DB_FILENAME", "default")
         db_path = get_sqlite_db_path(db_name)
         
-        # SQLite 벡터 데이터베이스 초기화함
-        VECTOR_DB = SQLiteVecDB(
+        # SQLite 벡터 데이터베이스 초기화함 (sqlitevec: 전체 스캔, hnsw: HNSW 근사 검색)
+        vector_db_backend = os.getenv("VECTOR_DB_BACKEND", "sqlitevec").lower()
+        if vector_db_backend == "sqlitevec":
+            vector_db_class = SQLiteVecDB
+        elif vector_db_backend == "hnsw":
+            vector_db_class = HNSWVecDB
+        else:
+            raise ValueError(f"지원하지 않는 VECTOR_DB_BACKEND: {vector_db_backend}")
+        VECTOR_DB = vector_db_class(
             db_filepath=db_path,
-            embedding_function=embedding.embed
+            embedding_function=embedding.embed,
+            async_embedding_function=embedding.aembed
         )
         DB_NAME = db_name
+        EMBEDDING = embedding
+        
+        # 검색용 연결을 미리 열고 페이지 캐시를 채움
+        await VECTOR_DB.awarm_up()
         print(f"벡터 데이터베이스 로드 완료: {db_path}")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"벡터 데이터베이스 초기화 실패: {str(e)}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료 시 벡터 데이터베이스의 검색용 연결을 닫음"""
+    if VECTOR_DB is not None:
+        await VECTOR_DB.aclose()
+
+
 
 ##################################
 ##### API 요청/응답 모델 정의 #####
@@ -93,39 +132,111 @@ class SearchResponse(BaseModel):
     query: str
     count: int
 
+# 배치 검색 요청의 최대 쿼리 개수
+# 제공자의 배치 크기 한도(Google 100)를 넘는 요청은 aembed_batch가 여러 배치로 나누어 동시에 요청함
+MAX_BATCH_SIZE = 500
+
 
 
 ##############################
 ##### API 엔드포인트 정의 #####
 
-@app.post("/v1/search/", response_model=SearchResponse)
-async def search(request: SearchRequest):
-    """RAG API 검색 엔드포인트"""
-    global VECTOR_DB
+async def search_many(requests: List[SearchRequest]) -> List[SearchResponse]:
+    """여러 검색 요청을 한 번의 임베딩 API 호출로 처리함
     
-    if VECTOR_DB is None:
-        raise HTTPException(status_code=500, detail="벡터 데이터베이스가 초기화되지 않음")
+    응답 캐시 → 배치 임베딩 → 시맨틱 캐시 → DB 검색 순서로 처리하며, 단일 검색 엔드포인트도 이 경로를 사용함
     
-    try:
-        # 데이터베이스 검색함
-        results_df = VECTOR_DB.search(request.query, k=request.k)
+    Args:
+        requests (List[SearchRequest]): 검색 요청 리스트
         
-        # 결과를 응답 형식으로 변환함
-        results = [
-            SearchResult(
-                content=row["content"],
-                distance=float(row["distance"])
+    Returns:
+        List[SearchResponse]: 요청 순서와 같은 순서의 검색 응답 리스트
+    """
+    responses: List[Optional[SearchResponse]] = [None] * len(requests)
+    cache_keys = [(request.query.strip().lower(), request.k) for request in requests]
+    
+    # 동일한 요청의 캐시된 응답이 있으면 바로 사용함
+    async with SEARCH_CACHE_LOCK:
+        for i, cache_key in enumerate(cache_keys):
+            cached = SEARCH_CACHE.get(cache_key)
+            if cached is not None:
+                responses[i] = cached.model_copy(update={"query": requests[i].query})
+    pending = [i for i, response in enumerate(responses) if response is None]
+    if not pending:
+        return responses
+    
+    # 캐시에 없는 쿼리를 한 번의 API 호출로 임베딩함 (이벤트 루프를 막지 않도록 비동기로 수행)
+    query_embeddings = await EMBEDDING.aembed_batch([requests[i].query for i in pending])
+    
+    # 의미가 거의 같은 쿼리의 캐시된 응답이 있으면 DB 검색 없이 사용함
+    to_search = []
+    for i, query_embedding in zip(pending, query_embeddings):
+        request = requests[i]
+        cached = SEMANTIC_CACHE.get(query_embedding, k=request.k)
+        if cached is not None:
+            responses[i] = SearchResponse(
+                results=cached.results[:request.k],
+                query=request.query,
+                count=min(cached.count, request.k)
             )
-            for _, row in results_df.iterrows()
-        ]
+        else:
+            to_search.append((i, query_embedding))
+    if not to_search:
+        return responses
+    
+    # 데이터베이스 검색함
+    batch_rows = await VECTOR_DB.asearch_batch(
+        [query_embedding for _, query_embedding in to_search],
+        k=[requests[i].k for i, _ in to_search]
+    )
+    
+    for (i, query_embedding), rows in zip(to_search, batch_rows):
+        request = requests[i]
         
-        # 응답 생성함
-        return SearchResponse(
+        # 결과를 응답 형식으로 변환함 (distance는 SQLite가 이미 Python float로 반환함)
+        results = [SearchResult(content=content, distance=distance) for content, distance in rows]
+        
+        # 응답 생성 후 캐시에 저장함
+        response = SearchResponse(
             results=results,
             query=request.query,
             count=len(results)
         )
+        responses[i] = response
+        async with SEARCH_CACHE_LOCK:
+            SEARCH_CACHE[cache_keys[i]] = response
+        SEMANTIC_CACHE.set(query_embedding, k=request.k, response=response)
     
+    return responses
+
+
+@app.post("/v1/search/", response_model=SearchResponse)
+async def search(request: SearchRequest):
+    """RAG API 검색 엔드포인트"""
+    global VECTOR_DB
+    
+    if VECTOR_DB is None:
+        raise HTTPException(status_code=500, detail="벡터 데이터베이스가 초기화되지 않음")
+    
+    try:
+        responses = await search_many([request])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
+    return responses[0]
+
+
+@app.post("/v1/search/batch", response_model=List[SearchResponse])
+async def search_batch(requests: List[SearchRequest]):
+    """여러 쿼리를 한 번에 검색하는 배치 검색 엔드포인트 (제공자의 배치 크기 한도 이내면 임베딩 API를 한 번만 호출함)"""
+    global VECTOR_DB
+    
+    if VECTOR_DB is None:
+        raise HTTPException(status_code=500, detail="벡터 데이터베이스가 초기화되지 않음")
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"배치 요청은 최대 {MAX_BATCH_SIZE}개까지 가능함")
+    
+    try:
+        return await search_many(requests)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
 
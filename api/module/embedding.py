@@ -1,7 +1,54 @@
-from typing import Literal, List, Union, Any, Optional
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from typing import Literal, List, Union, Any, Optional, Callable, Awaitable, TYPE_CHECKING
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_openai import OpenAIEmbeddings
+import numpy as np
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    # 제공자 패키지는 사용하는 것만 get_langchain_embeddings에서 불러옴 (워커 시작 시간/메모리 절약)
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    from langchain_openai import OpenAIEmbeddings
+
+
+# (제공자, 모델)별 임베딩 벡터 차원 (DB 초기화 시 차원 확인용 API 호출을 생략함)
+EMBED_DIMS = {
+    ("openai", "text-embedding-3-small"): 1536,
+    ("openai", "text-embedding-3-large"): 3072,
+    ("openai", "text-embedding-ada-002"): 1536,
+    ("google", "models/text-embedding-004"): 768,
+    ("google", "models/embedding-001"): 768,
+}
+
+# 제공자별 한 번의 배치 임베딩 요청에 넣을 수 있는 최대 텍스트 수
+MAX_BATCH_SIZES = {"openai": 2048, "google": 100}
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """API 오류 응답의 Retry-After 헤더 값(초)을 반환함. 없으면 None을 반환함"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """요청 한도 초과(429), 서버 오류(5xx), 연결 오류/타임아웃처럼 재시도할 수 있는 오류인지 확인함"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # OpenAI 클라이언트의 연결 오류/타임아웃 (APITimeoutError는 APIConnectionError의 하위 클래스임)
+    if any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__):
+        return True
+    # Google 클라이언트는 gRPC 오류를 GoogleGenerativeAIError로 감싸서 전달함
+    # NOTE: ServiceUnavailable은 Google 클라이언트(batch_embed_contents 기본 Retry)가 이미 재시도하므로 다시 재시도하지 않음
+    return type(exc.__cause__).__name__ in ("ResourceExhausted", "DeadlineExceeded", "InternalServerError")
 
 
 class Embedding:
@@ -14,58 +61,286 @@ class Embedding:
         api_key (str): 임베딩 API에 접근하기 위한 API 키임
         source (str): 사용할 임베딩 제공자('openai' 또는 'google')임
         model (str): 사용할 임베딩 모델명임
+        cache_size (int): 쿼리 해시별로 보관할 임베딩 벡터의 최대 개수임
+        max_in_flight (int): 동시에 진행할 수 있는 비동기 임베딩 API 요청 수임
+        max_retries (int): 요청 한도 초과/서버 오류/연결 오류 시 최대 재시도 횟수임
+        retry_deadline (float): 재시도와 대기 시간을 포함한 임베딩 요청 하나의 전체 제한 시간(초)임
+        dim (Optional[int]): 모델의 임베딩 벡터 차원임. EMBED_DIMS에 없는 모델이면 None임
     """
     
-    def __init__(self, api_key: str, source: Literal["openai", "google"] = "openai", model: Optional[str] = None) -> None:
+    def __init__(self, api_key: str, source: Literal["openai", "google"] = "openai", model: Optional[str] = None,
+                 cache_size: int = 4096, max_in_flight: int = 5, max_retries: int = 5,
+                 retry_deadline: float = 30.0) -> None:
         """Embedding 클래스의 인스턴스를 초기화함
         
         Args:
             api_key (str): API 제공자의 인증 키임
             source (Literal["openai", "google"], optional): 임베딩 제공자('openai' 또는 'google')임. 기본값은 'openai'임
             model (Optional[str], optional): 사용할 특정 모델명임. None인 경우 소스별 기본 모델이 선택됨
+            cache_size (int, optional): 임베딩 캐시 크기임. 0이면 캐시를 사용하지 않음. 기본값은 4096임
+            max_in_flight (int, optional): 동시에 진행할 수 있는 비동기 임베딩 API 요청 수임. 기본값은 5임
+            max_retries (int, optional): 요청 한도 초과/서버 오류/연결 오류 시 최대 재시도 횟수임. 기본값은 5임
+            retry_deadline (float, optional): 재시도와 대기 시간을 포함한 임베딩 요청 하나의 전체 제한 시간(초)임
+                (동기 요청은 재시도 대기만 제한함). 기본값은 30.0임
+            
+        Raises:
+            ValueError: 유효하지 않은 소스가 지정된 경우 발생함
         """
         self.api_key = api_key
         self.source = source.lower()  # openai, google
+        if self.source not in ("openai", "google"):
+            raise ValueError(f"invalid LLM API source: {source}")
         
         if model is None:
-            if source == "openai":
+            if self.source == "openai":
                 self.model = "text-embedding-3-small"
-            elif source == "google":
+            elif self.source == "google":
                 self.model = "models/text-embedding-004"
-            else:
-                print("> invalid source")
         else:
             self.model = model
+        self.dim = EMBED_DIMS.get((self.source, self.model))
+        
+        # 동일한 쿼리의 임베딩 API 재호출을 막기 위한 캐시 (key: 쿼리의 sha256)
+        self.cache_size = cache_size
+        self._cache = LRUCache(maxsize=cache_size) if cache_size > 0 else None
+        self._cache_lock = threading.Lock()
+        
+        # 요청 한도를 넘지 않도록 동시에 진행하는 비동기 API 요청 수를 제한함
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_deadline = retry_deadline
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._langchain_embeddings = None
     
     
-    def get_langchain_embeddings(self) -> Union[OpenAIEmbeddings, GoogleGenerativeAIEmbeddings]:
+    def get_langchain_embeddings(self) -> Union["OpenAIEmbeddings", "GoogleGenerativeAIEmbeddings"]:
         """LangChain 임베딩 객체를 생성하여 반환함
         
+        처음 호출할 때 생성한 객체를 이후 호출에서 재사용함
+        
         Returns:
             Union[OpenAIEmbeddings, GoogleGenerativeAIEmbeddings]: 설정된 제공자 및 모델에 해당하는 LangChain 임베딩 객체임
             
         Raises:
             ValueError: 유효하지 않은 소스가 지정된 경우 발생함
         """
+        # 요청 간에 HTTP 연결 풀을 공유하도록 한 번 생성한 객체를 재사용함
+        if self._langchain_embeddings is not None:
+            return self._langchain_embeddings
         if self.source == "openai":
-            embeddings = OpenAIEmbeddings(api_key=self.api_key, model=self.model)
+            # 재시도는 _request/_arequest에서만 수행하도록 OpenAI 클라이언트 자체 재시도(기본 2회)를 끔
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(api_key=self.api_key, model=self.model, max_retries=0)
         elif self.source == "google":
-            embeddings = GoogleGenerativeAIEmbeddings(google_api_key=self.api_key, model=self.model)
+            # 배치 임베딩(embed_documents)도 embed_query와 같은 RETRIEVAL_QUERY 태스크로 임베딩하도록 지정함
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            embeddings = GoogleGenerativeAIEmbeddings(google_api_key=self.api_key, model=self.model, task_type="retrieval_query")
         else:
             raise ValueError("invalid LLM API source")
+        self._langchain_embeddings = embeddings
         return embeddings
     
     
-    def embed(self, query: str) -> List[float]:
+    def _get_cached(self, key: str) -> Optional[List[float]]:
+        """캐시에서 임베딩 벡터를 조회함. 없으면 None을 반환함"""
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            return self._cache.get(key)
+    
+    
+    def _set_cached(self, key: str, vector: List[float]) -> None:
+        """임베딩 벡터를 캐시에 저장함"""
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = vector
+    
+    
+    def _retry_delay(self, exc: Exception, attempt: int, remaining: float) -> Optional[float]:
+        """실패한 요청을 다시 보내기 전에 기다릴 시간(초)을 반환함
+        
+        Retry-After 헤더 값 또는 지수 백오프(1, 2, 4, ...초 + 지터)를 사용함
+        
+        Args:
+            exc (Exception): 요청에서 발생한 오류임
+            attempt (int): 실패한 요청의 시도 번호임(0부터 시작)
+            remaining (float): retry_deadline까지 남은 시간(초)임
+            
+        Returns:
+            Optional[float]: 기다릴 시간. 재시도할 수 없는 오류이거나, 재시도 횟수를 모두 썼거나,
+                기다린 뒤 다시 요청할 시간이 남지 않으면 None
+        """
+        if attempt == self.max_retries or not _is_retryable(exc):
+            return None
+        delay = _retry_after(exc)
+        if delay is None:
+            delay = 2 ** attempt + random.uniform(0, 1)
+        if delay >= remaining:
+            return None
+        return delay
+    
+    
+    def _request(self, request: Callable[[], Any]) -> Any:
+        """동기 임베딩 API 요청을 _arequest와 같은 재시도 정책으로 수행함
+        
+        재시도 대기 시간은 retry_deadline을 넘지 않음. 진행 중인 요청 자체는 중단하지 않으므로 요청 시간은 클라이언트의 타임아웃을 따름
+        
+        Args:
+            request (Callable[[], Any]): 호출할 때마다 API 요청을 수행하는 함수
+            
+        Returns:
+            Any: API 응답 결과
+        """
+        deadline = time.monotonic() + self.retry_deadline
+        for attempt in range(self.max_retries + 1):
+            try:
+                return request()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline - time.monotonic())
+                if delay is None:
+                    raise
+                time.sleep(delay)
+    
+    
+    async def _arequest_once(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """동시 요청 수 제한(_semaphore) 안에서 비동기 임베딩 API 요청을 한 번 수행함"""
+        async with self._semaphore:
+            return await request()
+    
+    
+    async def _arequest(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """비동기 임베딩 API 요청을 동시 요청 수 제한과 재시도를 적용하여 수행함
+        
+        재시도 가능한 오류가 발생하면 Retry-After 헤더 값 또는 지수 백오프(1, 2, 4, ...초 + 지터)만큼 기다린 후 다시 요청함.
+        세마포어 대기, 요청, 재시도 대기를 모두 합쳐 retry_deadline초를 넘지 않음
+        
+        Args:
+            request (Callable[[], Awaitable[Any]]): 호출할 때마다 새 API 요청 코루틴을 만드는 함수
+            
+        Returns:
+            Any: API 응답 결과
+        
+        Raises:
+            asyncio.TimeoutError: retry_deadline 안에 요청이 끝나지 않은 경우 발생함
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.retry_deadline
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.wait_for(self._arequest_once(request), timeout=max(deadline - loop.time(), 0))
+            except Exception as e:
+                # 재시도할 수 없거나 기다린 뒤 다시 요청할 시간이 남지 않으면 마지막 오류를 그대로 전달함
+                delay = self._retry_delay(e, attempt, deadline - loop.time())
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+    
+    
+    def embed(self, query: str, as_array: bool = False) -> Union[List[float], np.ndarray]:
         """텍스트 쿼리를 임베딩 벡터로 변환함
         
         Args:
             query (str): 임베딩할 텍스트 문자열임
+            as_array (bool, optional): True이면 float32 numpy 배열로 반환함. 기본값은 False임
+            
+        Returns:
+            Union[List[float], np.ndarray]: 임베딩 벡터임
+        """
+        key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        vector = self._get_cached(key)
+        if vector is None:
+            embeddings = self.get_langchain_embeddings()
+            vector = self._request(lambda: embeddings.embed_query(query))
+            self._set_cached(key, vector)
+        return np.asarray(vector, dtype=np.float32) if as_array else vector
+    
+    
+    async def aembed(self, query: str, as_array: bool = False) -> Union[List[float], np.ndarray]:
+        """텍스트 쿼리를 비동기로 임베딩 벡터로 변환함
+        
+        LangChain의 비동기 클라이언트를 사용하므로 임베딩 API 호출 동안 이벤트 루프를 막지 않음
+        
+        Args:
+            query (str): 임베딩할 텍스트 문자열임
+            as_array (bool, optional): True이면 float32 numpy 배열로 반환함. 기본값은 False임
+            
+        Returns:
+            Union[List[float], np.ndarray]: 임베딩 벡터임
+        """
+        key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        vector = self._get_cached(key)
+        if vector is None:
+            embeddings = self.get_langchain_embeddings()
+            vector = await self._arequest(lambda: embeddings.aembed_query(query))
+            self._set_cached(key, vector)
+        return np.asarray(vector, dtype=np.float32) if as_array else vector
+    
+    
+    def _lookup_batch(self, queries: List[str]) -> tuple:
+        """배치 쿼리의 캐시를 조회하고 임베딩이 필요한 쿼리만 골라냄
+        
+        Args:
+            queries (List[str]): 임베딩할 텍스트 문자열 리스트임
             
         Returns:
-            List[float]: 임베딩 벡터임
+            tuple: (쿼리별 캐시 키 리스트, 쿼리별 캐시된 벡터 리스트(없으면 None), 중복을 제거한 미적중 쿼리 딕셔너리 {키: 쿼리})
         """
+        keys = [hashlib.sha256(query.encode("utf-8")).hexdigest() for query in queries]
+        vectors = [self._get_cached(key) for key in keys]
+        missing = {key: query for key, query, vector in zip(keys, queries, vectors) if vector is None}
+        return keys, vectors, missing
+    
+    
+    def _fill_batch(self, keys: List[str], vectors: List[Optional[List[float]]],
+                    missing: dict, new_vectors: List[List[float]]) -> List[List[float]]:
+        """새로 임베딩한 벡터를 캐시에 저장하고 입력 순서대로 결과를 합침"""
+        found = dict(zip(missing.keys(), new_vectors))
+        for key, vector in found.items():
+            self._set_cached(key, vector)
+        return [found[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+    
+    
+    def embed_batch(self, queries: List[str]) -> List[List[float]]:
+        """여러 텍스트 쿼리를 한 번의 임베딩 API 호출로 벡터로 변환함
+        
+        캐시에 없는 쿼리만 모아서 embed_documents로 한 번에 요청함
+        
+        Args:
+            queries (List[str]): 임베딩할 텍스트 문자열 리스트임
+            
+        Returns:
+            List[List[float]]: 입력 순서와 같은 순서의 임베딩 벡터 리스트임
+        """
+        keys, vectors, missing = self._lookup_batch(queries)
+        if not missing:
+            return vectors
         embeddings = self.get_langchain_embeddings()
-        vector = embeddings.embed_query(query)
-        return vector
-
+        texts = list(missing.values())
+        new_vectors = self._request(lambda: embeddings.embed_documents(texts))
+        return self._fill_batch(keys, vectors, missing, new_vectors)
+    
+    
+    async def aembed_batch(self, queries: List[str]) -> List[List[float]]:
+        """여러 텍스트 쿼리를 배치 임베딩 API 호출로 비동기 변환함
+        
+        제공자의 배치 크기 한도를 넘는 경우 여러 배치로 나누어 asyncio.gather로 동시에 요청함
+        
+        Args:
+            queries (List[str]): 임베딩할 텍스트 문자열 리스트임
+            
+        Returns:
+            List[List[float]]: 입력 순서와 같은 순서의 임베딩 벡터 리스트임
+        """
+        keys, vectors, missing = self._lookup_batch(queries)
+        if not missing:
+            return vectors
+        embeddings = self.get_langchain_embeddings()
+        texts = list(missing.values())
+        batch_size = MAX_BATCH_SIZES.get(self.source, 100)
+        chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*[
+            self._arequest(lambda chunk=chunk: embeddings.aembed_documents(chunk)) for chunk in chunks
+        ])
+        new_vectors = [vector for result in results for vector in result]
+        return self._fill_batch(keys, vectors, missing, new_vectors)
@@ -0,0 +1,230 @@
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Set, Callable
+
+import numpy as np
+
+from .utils import normalize_l2
+
+
+class VecStore:
+    """L2 정규화된 임베딩 벡터를 하나의 연속된 float32 행렬로 보관하는 클래스
+
+    벡터마다 Python 리스트를 두는 대신 (용량, 차원) 크기의 행렬에 행 단위로 저장하여
+    유사도 계산을 한 번의 행렬-벡터 곱(BLAS sgemv)으로 처리함. 용량이 부족하면 두 배로 늘려 재할당 비용을 분산함
+
+    Attributes:
+        mat (Optional[np.ndarray]): (용량, 차원) 크기의 float32 행렬. 첫 벡터가 추가될 때 생성됨
+        ids (List[int]): 각 행에 대응하는 항목 ID 리스트
+    """
+
+    def __init__(self, capacity: int = 1024, max_capacity: Optional[int] = None) -> None:
+        """VecStore 클래스의 인스턴스를 초기화함
+
+        Args:
+            capacity (int, optional): 처음 할당할 행 수임. 기본값은 1024
+            max_capacity (Optional[int], optional): 용량을 늘릴 때의 최대 행 수임. None이면 제한하지 않음
+        """
+        self.capacity = max(1, capacity)
+        self.max_capacity = max_capacity
+        self.mat: Optional[np.ndarray] = None
+        self.ids: List[int] = []
+
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+    def add(self, vector: np.ndarray, id_: int) -> int:
+        """정규화된 벡터를 새 행으로 추가함
+
+        Args:
+            vector (np.ndarray): 정규화된 float32 벡터임
+            id_ (int): 행에 대응하는 항목 ID임
+
+        Returns:
+            int: 벡터가 저장된 행 번호
+        """
+        row = len(self.ids)
+        if self.mat is None:
+            self.mat = np.empty((self.capacity, vector.shape[0]), dtype=np.float32)
+        elif row == self.mat.shape[0]:
+            # 용량을 두 배로 늘림 (max_capacity를 넘지 않음)
+            new_capacity = self.mat.shape[0] * 2
+            if self.max_capacity is not None:
+                new_capacity = max(row + 1, min(new_capacity, self.max_capacity))
+            grown = np.empty((new_capacity, self.mat.shape[1]), dtype=np.float32)
+            grown[:row] = self.mat
+            self.mat = grown
+        self.mat[row] = vector
+        self.ids.append(id_)
+        return row
+
+
+    def replace(self, row: int, vector: np.ndarray, id_: int) -> None:
+        """기존 행의 벡터와 항목 ID를 교체함"""
+        self.mat[row] = vector
+        self.ids[row] = id_
+
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """정규화된 쿼리 벡터와 저장된 벡터들의 코사인 유사도를 계산함
+
+        Args:
+            query (np.ndarray): 정규화된 float32 쿼리 벡터임
+            rows (Optional[np.ndarray], optional): 유사도를 계산할 행 번호 배열임. None이면 저장된 모든 행을 계산함
+
+        Returns:
+            np.ndarray: 행별 코사인 유사도 배열
+        """
+        if self.mat is None:
+            return np.zeros(0, dtype=np.float32)
+        if rows is None:
+            return self.mat[:len(self.ids)] @ query
+        return self.mat[rows] @ query
+
+
+
+class SemanticCache:
+    """쿼리 임베딩의 코사인 유사도를 기준으로 검색 응답을 재사용하는 시맨틱 캐시 클래스
+
+    최근 쿼리 임베딩을 VecStore 행렬로 보관하고, 새 쿼리 임베딩과의 유사도를 한 번의 행렬-벡터 곱으로 계산함.
+    유사도가 임계값을 넘는 캐시 항목이 있으면 DB 검색 없이 해당 응답을 반환함.
+    항목 수가 max_size를 넘으면 가장 오래 사용되지 않은 항목을 제거함(LRU).
+    ttl이 주어지면 저장 후 ttl초가 지난 항목은 적중 후보에서 제외하고, 새 항목을 저장할 때 먼저 재사용함
+
+    Attributes:
+        max_size (int): 보관할 최대 캐시 항목 수
+        threshold (float): 캐시 적중으로 판단하는 최소 코사인 유사도
+        n_planes (int): LSH 버킷 계산에 사용하는 랜덤 초평면 수. 0이면 전체 항목과 비교함
+        ttl (Optional[float]): 항목을 유지하는 시간(초). None이면 만료하지 않음
+    """
+
+    def __init__(self, max_size: int = 10000, threshold: float = 0.95, n_planes: int = 0, seed: int = 0,
+                 ttl: Optional[float] = None, timer: Callable[[], float] = time.monotonic) -> None:
+        """SemanticCache 클래스의 인스턴스를 초기화함
+
+        Args:
+            max_size (int, optional): 보관할 최대 캐시 항목 수임. 기본값은 10000
+            threshold (float, optional): 캐시 적중으로 판단하는 최소 코사인 유사도임. 기본값은 0.95
+            n_planes (int, optional): 랜덤 프로젝션 LSH 초평면 수임(최대 62). 항목 수가 매우 클 때(10만 이상) 같은 버킷의 항목만
+                비교하도록 설정함. 기본값은 0(LSH 미사용)
+            seed (int, optional): LSH 초평면 생성에 사용하는 난수 시드임. 기본값은 0
+            ttl (Optional[float], optional): 항목을 유지하는 시간(초)임. 기본값은 None(만료하지 않음)
+            timer (Callable[[], float], optional): 현재 시각을 반환하는 함수임(cachetools.TTLCache와 같은 방식). 기본값은 time.monotonic
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.n_planes = n_planes
+        self.ttl = ttl
+        self._timer = timer
+        self._rng = np.random.default_rng(seed)
+
+        self._store = VecStore(capacity=min(max_size, 1024), max_capacity=max_size)  # 슬롯별 정규화된 쿼리 임베딩
+        self._ks = np.zeros(max(max_size, 0), dtype=np.int64)  # 각 슬롯이 검색한 결과 개수 k
+        self._expires = np.full(max(max_size, 0), np.inf)  # 각 슬롯의 만료 시각 (timer 기준)
+        self._responses: List[Any] = []  # 각 항목의 캐시된 응답
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # 슬롯 번호의 사용 순서 (앞쪽이 가장 오래됨)
+
+        self._planes: Optional[np.ndarray] = None  # (n_planes, 차원) LSH 초평면
+        self._slot_buckets: List[int] = []  # 각 슬롯의 LSH 버킷
+        self._buckets: Dict[int, Set[int]] = {}  # LSH 버킷별 슬롯 번호
+
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+    def _bucket(self, vector: np.ndarray) -> int:
+        """정규화된 벡터의 LSH 버킷 번호를 계산함"""
+        if self._planes is None:
+            self._planes = self._rng.standard_normal((self.n_planes, vector.shape[0])).astype(np.float32)
+        bits = (self._planes @ vector) > 0
+        return int(bits.dot(1 << np.arange(self.n_planes, dtype=np.int64)))
+
+
+    def get(self, embedding: List[float], k: int) -> Optional[Any]:
+        """쿼리 임베딩과 충분히 유사한 캐시 항목의 응답을 반환함
+
+        k개 이상의 결과를 가진 항목만 후보로 사용하며, 응답의 결과 개수 조정은 호출 측에서 수행함
+
+        Args:
+            embedding (List[float]): 쿼리 임베딩 벡터임
+            k (int): 요청한 결과 개수임
+
+        Returns:
+            Optional[Any]: 캐시된 응답. 적중하지 않으면 None
+        """
+        if len(self._responses) == 0:
+            return None
+        vector = normalize_l2(embedding)
+
+        if self.n_planes > 0:
+            # 같은 LSH 버킷의 항목만 비교함
+            slots = self._buckets.get(self._bucket(vector))
+            if not slots:
+                return None
+            slots = np.fromiter(slots, dtype=np.int64)
+            sims = self._store.scores(vector, rows=slots)
+        else:
+            slots = np.arange(len(self._responses))
+            sims = self._store.scores(vector)
+
+        # 요청한 k보다 적은 결과를 가진 항목과 만료된 항목은 제외함
+        valid = (self._ks[slots] >= k) & (self._expires[slots] > self._timer())
+        if not valid.any():
+            return None
+        slots, sims = slots[valid], sims[valid]
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        slot = int(slots[best])
+        self._lru.move_to_end(slot)
+        return self._responses[slot]
+
+
+    def set(self, embedding: List[float], k: int, response: Any) -> None:
+        """쿼리 임베딩과 응답을 캐시에 저장함
+
+        Args:
+            embedding (List[float]): 쿼리 임베딩 벡터임
+            k (int): 응답의 결과 개수 k임
+            response (Any): 캐시할 응답 객체임
+        """
+        if self.max_size <= 0:
+            return
+        vector = normalize_l2(embedding)
+        now = self._timer()
+
+        # 만료된 슬롯이 있으면 LRU 순서와 관계없이 먼저 재사용함 (없으면 -1)
+        expired = -1
+        if self.ttl is not None and len(self._responses) > 0:
+            oldest = int(np.argmin(self._expires[:len(self._responses)]))
+            if self._expires[oldest] <= now:
+                expired = oldest
+
+        if expired < 0 and len(self._responses) < self.max_size:
+            # 새 슬롯 추가
+            slot = self._store.add(vector, len(self._responses))
+            self._responses.append(response)
+            self._slot_buckets.append(-1)
+        else:
+            # 만료된 슬롯 또는 가장 오래 사용되지 않은 슬롯을 재사용
+            if expired >= 0:
+                slot = expired
+                del self._lru[slot]
+            else:
+                slot, _ = self._lru.popitem(last=False)
+            self._store.replace(slot, vector, slot)
+            self._responses[slot] = response
+            if self.n_planes > 0:
+                self._buckets[self._slot_buckets[slot]].discard(slot)
+        self._ks[slot] = k
+        self._expires[slot] = np.inf if self.ttl is None else now + self.ttl
+
+        if self.n_planes > 0:
+            bucket = self._bucket(vector)
+            self._slot_buckets[slot] = bucket
+            self._buckets.setdefault(bucket, set()).add(slot)
+        self._lru[slot] = None
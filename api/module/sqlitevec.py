@@ -1,124 +1,687 @@
+import asyncio
+from abc import ABC, abstractmethod
+import threading
 import time
 import json
 import os
+import re
+import shutil
+import tempfile
 from pathlib import Path
-from typing import Optional, Callable, List, Dict, Any, Union
+from typing import Optional, Callable, Awaitable, List, Dict, Any, Tuple, Union, TYPE_CHECKING
 
 import sqlite3
+import aiosqlite
 import sqlite_vec
-import pandas as pd
+import vectorlite_py
+import numpy as np
 
+from .utils import normalize_l2
 
+if TYPE_CHECKING:
+    # pandas는 관리용 get_all에서만 사용하므로 서버 시작 시 불러오지 않음
+    import pandas as pd
 
 
-class SQLiteVecDB:
-    """임베딩 벡터를 SQLite 데이터베이스에 저장하고 검색하는 클래스
+# 모든 연결에 적용하는 PRAGMA 목록 (WAL 저널, 1GB mmap, 128MB 페이지 캐시)
+# WAL 모드에서는 읽기 연결끼리 파일 잠금을 다투지 않고, mmap으로 임베딩 페이지를 복사 없이 읽음
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA cache_size=-131072",
+    "PRAGMA temp_store=MEMORY",
+)
 
-    sqlite-vec 확장을 활용하여 벡터 유사도 검색을 지원하는 벡터 데이터베이스를 구현
-    텍스트 쿼리와 내용을 임베딩 벡터와 함께 저장하고, 유사도 기반 검색 기능을 제공
+# 검색 전용 영구 연결에 추가로 적용하는 PRAGMA 목록
+READ_ONLY_PRAGMAS = (
+    "PRAGMA query_only=1",
+)
+
+# 검색 결과 한 행 (content, distance)
+SearchRow = Tuple[str, float]
+
+# vector_type별 vec0 임베딩 컬럼 정의 ({dim}: 임베딩 차원)
+# NOTE: bfloat16/float16 컬럼은 sqlite-vec 0.1.6에서 지원하지 않음 (float16[N]은 float[N]으로 해석됨)
+# NOTE: sqlite-vec 0.1.6는 내적(ip) 거리를 지원하지 않으므로 float32는 기본 L2 거리를 사용함.
+#       저장/쿼리 벡터를 모두 L2 정규화하면 L2 거리 순서가 코사인 거리 순서와 같고, 행마다 노름을 계산하지 않음
+VEC0_COLUMN_TYPES = {
+    "float32": "float[{dim}]",
+    "int8": "int8[{dim}] distance_metric=cosine",  # 행마다 스케일이 달라도 코사인 거리는 변하지 않음
+}
+
+# vector_type별 검색 결과 거리 표현식 (모두 코사인 거리 1 - cos로 반환함)
+# 정규화된 벡터의 L2 거리 d는 d^2 = 2 - 2cos 이므로 d^2 / 2 = 1 - cos 임
+VEC0_DISTANCES = {
+    "float32": "distance * distance / 2",
+    "int8": "distance",
+}
+
+# 출처 없이 추가한 행의 source 파티션 키 값
+# NOTE: sqlite-vec 0.1.6는 NULL 파티션 키 값끼리 같은 파티션으로 묶지 않아 행마다 청크를 하나씩 만들고,
+#       필터 없는 검색이 행 수만큼의 청크를 읽게 됨 (2200행 기준 0.2ms → 100ms)
+NO_SOURCE = ""
+
+# k를 SQL 문자열에 상수로 넣어 미리 만들어 둘 최대 결과 개수 (API의 k 범위 1~10)
+MAX_SPECIALIZED_K = 10
+
+# vector_type별 임베딩 BLOB 바인딩 표현식
+VEC0_BINDINGS = {
+    "float32": "?",
+    "int8": "vec_int8(?)",
+}
+
+
+def get_embedding_dim(embedding_function: Optional[Callable]) -> Optional[int]:
+    """임베딩 함수가 알려준 임베딩 차원을 반환함
+
+    함수 자체 또는 바운드 메서드의 인스턴스(예: Embedding.embed의 Embedding)에 dim 속성이 있으면 그 값을 사용함
+
+    Args:
+        embedding_function (Optional[Callable]): 텍스트를 벡터로 변환하는 함수
+
+    Returns:
+        Optional[int]: 임베딩 차원. 알 수 없으면 None
+    """
+    dim = getattr(embedding_function, "dim", None)
+    if dim is None:
+        dim = getattr(getattr(embedding_function, "__self__", None), "dim", None)
+    return dim
+
+
+def _to_blob(vector: Union[List[float], np.ndarray]) -> bytes:
+    """벡터를 sqlite-vec/vectorlite가 읽는 리틀 엔디언 float32 BLOB으로 변환함 (요소별 struct.pack 없이 한 번에 복사함)"""
+    return np.ascontiguousarray(vector, dtype="<f4").tobytes()
+
+
+def normalized_blob(embedding: List[float]) -> bytes:
+    """임베딩 벡터를 L2 정규화하고 float32 BLOB으로 직렬화함
+
+    변환 → 정규화 → 직렬화를 한 번의 복사, 한 번의 노름 계산, 한 번의 memcpy로 처리함
+
+    Args:
+        embedding (List[float]): 직렬화할 임베딩 벡터임
+
+    Returns:
+        bytes: 정규화된 벡터의 리틀 엔디언 float32 BLOB
+    """
+    return _to_blob(normalize_l2(embedding))
+
+
+def quantize_int8(embedding: List[float]) -> tuple:
+    """임베딩 벡터를 int8로 스칼라 양자화함
+    
+    scale = max(|x|) / 127로 나눈 뒤 반올림하여 [-127, 127] 범위의 int8 벡터로 변환함
+    
+    Args:
+        embedding (List[float]): 양자화할 임베딩 벡터임
+        
+    Returns:
+        tuple: (int8 벡터(np.ndarray), 원래 값으로 복원할 때 곱하는 스케일(float))
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vector).max()) / 127 if vector.size else 0.0
+    if scale == 0.0:
+        scale = 1.0
+    quantized = np.round(vector / scale).clip(-127, 127).astype(np.int8)
+    return quantized, scale
+
+
+def quantized_blob(embedding: List[float]) -> Tuple[bytes, float]:
+    """임베딩 벡터를 L2 정규화하고 int8로 양자화한 BLOB과 스케일을 반환함
+
+    Args:
+        embedding (List[float]): 직렬화할 임베딩 벡터임
+
+    Returns:
+        Tuple[bytes, float]: (int8 BLOB, 정규화된 벡터로 복원할 때 곱하는 스케일)
+    """
+    quantized, scale = quantize_int8(normalize_l2(embedding))
+    return quantized.tobytes(), scale
+
+
+
+
+
+class BaseVecDB(ABC):
+    """SQLiteVecDB와 HNSWVecDB가 공유하는 검색 연결 관리와 검색 메서드를 구현하는 기본 클래스
+    
+    각 백엔드는 확장을 로드하는 connect/connect_async와 k-NN 검색 SQL을 만드는 _search_statement만 구현함.
+    세 메서드는 추상 메서드이므로 하나라도 구현하지 않은 백엔드는 인스턴스를 생성할 때 TypeError가 발생함
     
     Attributes:
         db_filepath (str): SQLite 데이터베이스 파일 경로
         embed (Callable[[str], List[float]]): 텍스트를 벡터로 변환하는 임베딩 함수
+        aembed (Optional[Callable[[str], Awaitable[List[float]]]]): 텍스트를 벡터로 변환하는 비동기 임베딩 함수
         embedding_size (int): 임베딩 벡터의 차원 크기
     """
     
-    def __init__(self, db_filepath: str, embedding_size: Optional[int] = None, 
-                 embedding_function: Optional[Callable[[str], List[float]]] = None, 
-                 init_db: bool = False) -> None:
-        """SQLiteVecDB 클래스의 인스턴스를 초기화함
+    # source 컬럼을 저장하는 테이블 이름 (백엔드에서 지정함)
+    SOURCE_TABLE = "vectors"
+    
+    def __init__(self, db_filepath: str, embedding_size: Optional[int] = None,
+                 embedding_function: Optional[Callable[[str], List[float]]] = None,
+                 async_embedding_function: Optional[Callable[[str], Awaitable[List[float]]]] = None) -> None:
+        """공통 속성과 검색용 연결 상태를 초기화함
         
         Args:
             db_filepath (str): SQLite 데이터베이스 파일 경로임
             embedding_size (Optional[int], optional): 임베딩 벡터의 차원 크기임. 제공되지 않으면 자동 계산함
             embedding_function (Optional[Callable[[str], List[float]]], optional): 텍스트를 벡터로 변환하는 함수
-            init_db (bool, optional): True이면 데이터베이스를 초기화함. 기본값은 False
+            async_embedding_function (Optional[Callable[[str], Awaitable[List[float]]]], optional): 텍스트를 벡터로 변환하는 비동기 함수. 없으면 embedding_function을 스레드에서 실행함
         """
         self.db_filepath = db_filepath
         self.embed = embedding_function  # 실행 시 한 문장을 임베딩하는 함수
-
-        # 임베딩 사이즈가 주어지지 않았을 경우, 임베딩 함수를 통해 임베딩 사이즈를 추출
+        self.aembed = async_embedding_function  # asearch에서 사용하는 비동기 임베딩 함수
+        
+        # 임베딩 사이즈가 주어지지 않았을 경우, 임베딩 모델의 알려진 차원을 사용하고 없으면 임베딩 함수를 통해 추출
+        if embedding_size is None:
+            embedding_size = get_embedding_dim(embedding_function)
         if embedding_size is None:
             embedding = self.embed("test")
             self.embedding_size = len(embedding)
         else:
             self.embedding_size = embedding_size
         
+        # 검색용 영구 연결 (확장/인덱스 로드 비용을 매 요청마다 지불하지 않도록 첫 검색 시 생성하고 재사용함)
+        # 연결별로 연 시점의 인덱스 버전(_index_version)을 함께 보관함
+        self._conn = None
+        self._conn_version = None
+        self._conn_lock = threading.Lock()
+        self._aconn = None
+        self._aconn_version = None
+        self._aconn_lock = asyncio.Lock()
+        # SOURCE_TABLE에 source 컬럼이 있는지 여부 (처음 확인할 때 저장함)
+        self._has_source = None
+    
+    
+    @abstractmethod
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """백엔드 확장을 로드한 SQLite 연결을 생성함 (백엔드에서 구현함)"""
+    
+    
+    @abstractmethod
+    async def connect_async(self) -> aiosqlite.Connection:
+        """백엔드 확장을 로드한 비동기 SQLite 연결을 생성함 (백엔드에서 구현함)"""
+    
+    
+    @abstractmethod
+    def _search_statement(self, embedding: List[float], k: int, source: Optional[str] = None) -> tuple:
+        """k-NN 검색 SQL과 바인딩 파라미터를 반환함 (백엔드에서 구현함)"""
+    
+    
+    def _index_version(self) -> Any:
+        """검색 연결을 연 뒤 다른 연결이 인덱스를 바꿨는지 판단하는 값을 반환함
+        
+        값이 검색 연결을 연 시점과 다르면 검색 연결을 다시 엶.
+        기본 구현은 None을 반환함 (SQLite 테이블에 저장하는 인덱스는 다른 연결의 쓰기가 바로 보이므로 다시 열 필요가 없음)
+        """
+        return None
+    
+    
+    def _snapshot_index(self) -> Tuple[Optional[str], Optional[str]]:
+        """검색 연결 전용 인덱스 사본을 임시 디렉토리에 만들고 (사본을 여는 SQL, 임시 디렉토리 경로)를 반환함
+        
+        임시 디렉토리는 SQL을 실행한 직후 삭제함. 기본 구현은 사본을 만들지 않음 ((None, None))
+        """
+        return None, None
+    
+    
+    def _has_source_column(self) -> bool:
+        """SOURCE_TABLE에 source 컬럼이 있는지 반환함
+        
+        source 컬럼을 추가하기 전에 만든 기존 테이블을 구분하기 위해 테이블 정의를 처음 한 번만 확인함 (initialize_table 호출 시 다시 확인함).
+        테이블이 아직 없으면 확인 결과를 저장하지 않고 True를 반환함 (테이블이 없다는 SQLite 오류를 그대로 전달함)
+        """
+        if self._has_source is None:
+            db = sqlite3.connect(self.db_filepath)
+            row = db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", [self.SOURCE_TABLE]).fetchone()
+            db.close()
+            if row is None:
+                return True
+            self._has_source = re.search(r"\bsource\b", row[0]) is not None
+        return self._has_source
+    
+    
+    def _require_source_column(self) -> None:
+        """SOURCE_TABLE에 source 컬럼이 없으면 ValueError를 발생시킴
+        
+        Raises:
+            ValueError: source 컬럼이 없는 기존 테이블에 source를 저장하거나 source로 검색하려는 경우 발생함
+        """
+        if not self._has_source_column():
+            raise ValueError(f"{self.SOURCE_TABLE} 테이블에 source 컬럼이 없어 source를 저장하거나 source로 검색할 수 없음 "
+                             f"(source 컬럼이 있는 테이블로 다시 생성해야 함)")
+    
+    
+    def _close_search_connection(self) -> None:
+        """동기 검색용 영구 연결을 닫음 (호출 측에서 _conn_lock으로 보호함)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = self._conn_version = None
+    
+    
+    async def _close_search_connection_async(self) -> None:
+        """비동기 검색용 영구 연결을 닫음 (호출 측에서 _aconn_lock으로 보호함)"""
+        if self._aconn is not None:
+            await self._aconn.close()
+            self._aconn = self._aconn_version = None
+    
+    
+    def get_search_connection(self) -> sqlite3.Connection:
+        """검색에 재사용하는 읽기 전용 영구 연결을 반환함
+        
+        여러 스레드에서 사용할 수 있도록 check_same_thread=False로 열고 호출 측에서 _conn_lock으로 보호함.
+        연결을 연 뒤 인덱스가 바뀌었으면(_index_version) 연결을 닫고 새로 엶
+        
+        Returns:
+            sqlite3.Connection: 백엔드 확장이 활성화된 읽기 전용 데이터베이스 연결 객체
+        """
+        version = self._index_version()
+        if self._conn is not None and self._conn_version != version:
+            self._close_search_connection()
+        if self._conn is None:
+            db = self.connect(check_same_thread=False)
+            sql, snapshot_dir = self._snapshot_index()
+            if sql is not None:
+                try:
+                    db.execute(sql)
+                except Exception:
+                    db.close()
+                    raise
+                finally:
+                    # 사본은 이미 메모리에 로드되었으므로 바로 삭제함
+                    shutil.rmtree(snapshot_dir, ignore_errors=True)
+            for pragma in READ_ONLY_PRAGMAS:
+                db.execute(pragma)
+            self._conn, self._conn_version = db, version
+        return self._conn
+    
+    
+    async def get_search_connection_async(self) -> aiosqlite.Connection:
+        """비동기 검색에 재사용하는 읽기 전용 영구 연결을 반환함
+        
+        연결을 연 뒤 인덱스가 바뀌었으면(_index_version) 연결을 닫고 새로 엶.
+        닫는 연결에 이미 보낸 쿼리는 aiosqlite가 닫기 전에 모두 실행함
+        
+        Returns:
+            aiosqlite.Connection: 백엔드 확장이 활성화된 읽기 전용 비동기 데이터베이스 연결 객체
+        """
+        async with self._aconn_lock:
+            version = self._index_version()
+            if self._aconn is not None and self._aconn_version != version:
+                await self._close_search_connection_async()
+            if self._aconn is None:
+                db = await self.connect_async()
+                # 인덱스 파일 복사는 이벤트 루프를 막지 않도록 스레드에서 수행함
+                sql, snapshot_dir = await asyncio.to_thread(self._snapshot_index)
+                if sql is not None:
+                    try:
+                        await db.execute(sql)
+                    except Exception:
+                        await db.close()
+                        raise
+                    finally:
+                        shutil.rmtree(snapshot_dir, ignore_errors=True)
+                for pragma in READ_ONLY_PRAGMAS:
+                    await db.execute(pragma)
+                self._aconn, self._aconn_version = db, version
+        return self._aconn
+    
+    
+    async def aclose(self) -> None:
+        """검색용 영구 연결을 모두 닫음 (asearch를 사용했다면 종료 전에 호출해야 aiosqlite 스레드가 정리됨)"""
+        with self._conn_lock:
+            self._close_search_connection()
+        async with self._aconn_lock:
+            await self._close_search_connection_async()
+    
+    
+    async def awarm_up(self) -> None:
+        """비동기 검색용 연결을 미리 열고 더미 벡터로 k-NN 검색을 한 번 실행하여 캐시를 채움
+        
+        첫 요청이 확장 로드, 인덱스 로드, 콜드 페이지 읽기 비용을 지불하지 않도록 서버 시작 시 한 번 호출함.
+        count(*)는 임베딩 페이지나 HNSW 그래프를 읽지 않으므로 실제 검색과 같은 SQL을 vectors 테이블에 실행함
+        """
+        dummy = [1.0] + [0.0] * (self.embedding_size - 1)
+        await self.asearch_by_embedding(dummy, k=1)
+    
+    
+    def search(self, query: str, k: int = 3, source: Optional[str] = None) -> List[SearchRow]:
+        """쿼리와 유사한 상위 k개의 항목을 검색함
+        
+        Args:
+            query (str): 검색할 쿼리 텍스트임
+            k (int, optional): 반환할 최대 항목 수임. 기본값은 3임
+            source (Optional[str], optional): 검색할 출처임. None이면 전체를 검색함
+            
+        Returns:
+            List[SearchRow]: 거리 오름차순으로 정렬된 (content, distance) 튜플 리스트
+        """
+        embedding = self.embed(query)
+        embedding = embedding[:self.embedding_size]
+        
+        with self._conn_lock:
+            db = self.get_search_connection()
+            results = db.execute(*self._search_statement(embedding, k, source)).fetchall()
+        
+        return results
+    
+    
+    async def asearch(self, query: str, k: int = 3, source: Optional[str] = None) -> List[SearchRow]:
+        """쿼리와 유사한 상위 k개의 항목을 비동기로 검색함
+        
+        임베딩 API 호출과 SQLite 쿼리 모두 이벤트 루프를 막지 않도록 비동기로 수행함
+        
+        Args:
+            query (str): 검색할 쿼리 텍스트임
+            k (int, optional): 반환할 최대 항목 수임. 기본값은 3임
+            source (Optional[str], optional): 검색할 출처임. None이면 전체를 검색함
+            
+        Returns:
+            List[SearchRow]: 거리 오름차순으로 정렬된 (content, distance) 튜플 리스트
+        """
+        if self.aembed is not None:
+            embedding = await self.aembed(query)
+        else:
+            embedding = await asyncio.to_thread(self.embed, query)
+        return await self.asearch_by_embedding(embedding, k=k, source=source)
+    
+    
+    async def asearch_by_embedding(self, embedding: List[float], k: int = 3, source: Optional[str] = None) -> List[SearchRow]:
+        """이미 계산된 임베딩 벡터와 유사한 상위 k개의 항목을 비동기로 검색함
+        
+        Args:
+            embedding (List[float]): 검색할 쿼리의 임베딩 벡터임
+            k (int, optional): 반환할 최대 항목 수임. 기본값은 3임
+            source (Optional[str], optional): 검색할 출처임. None이면 전체를 검색함
+            
+        Returns:
+            List[SearchRow]: 거리 오름차순으로 정렬된 (content, distance) 튜플 리스트
+        """
+        embedding = embedding[:self.embedding_size]
+        
+        db = await self.get_search_connection_async()
+        results = await db.execute_fetchall(*self._search_statement(embedding, k, source))
+        
+        return results
+    
+    
+    def search_batch(self, embeddings: List[List[float]], k: Union[int, List[int]] = 3,
+                     source: Optional[str] = None) -> List[List[SearchRow]]:
+        """여러 임베딩 벡터에 대해 하나의 연결에서 k-NN 검색을 반복 수행함
+        
+        Args:
+            embeddings (List[List[float]]): 검색할 쿼리 임베딩 벡터 리스트임
+            k (Union[int, List[int]], optional): 반환할 최대 항목 수임. 리스트이면 임베딩별로 지정함. 기본값은 3임
+            source (Optional[str], optional): 모든 임베딩에 적용할 출처 필터임. None이면 전체를 검색함
+            
+        Returns:
+            List[List[SearchRow]]: 임베딩 순서와 같은 순서의 검색 결과 리스트
+        """
+        ks = [k] * len(embeddings) if isinstance(k, int) else k
+        batch_results = []
+        with self._conn_lock:
+            db = self.get_search_connection()
+            for embedding, k_ in zip(embeddings, ks):
+                embedding = embedding[:self.embedding_size]
+                results = db.execute(*self._search_statement(embedding, k_, source)).fetchall()
+                batch_results.append(results)
+        return batch_results
+    
+    
+    async def asearch_batch(self, embeddings: List[List[float]], k: Union[int, List[int]] = 3,
+                            source: Optional[str] = None) -> List[List[SearchRow]]:
+        """여러 임베딩 벡터에 대해 하나의 비동기 연결에서 k-NN 검색을 반복 수행함
+        
+        Args:
+            embeddings (List[List[float]]): 검색할 쿼리 임베딩 벡터 리스트임
+            k (Union[int, List[int]], optional): 반환할 최대 항목 수임. 리스트이면 임베딩별로 지정함. 기본값은 3임
+            source (Optional[str], optional): 모든 임베딩에 적용할 출처 필터임. None이면 전체를 검색함
+            
+        Returns:
+            List[List[SearchRow]]: 임베딩 순서와 같은 순서의 검색 결과 리스트
+        """
+        ks = [k] * len(embeddings) if isinstance(k, int) else k
+        return [await self.asearch_by_embedding(embedding, k=k_, source=source) for embedding, k_ in zip(embeddings, ks)]
+
+
+
+class SQLiteVecDB(BaseVecDB):
+    """임베딩 벡터를 SQLite 데이터베이스에 저장하고 검색하는 클래스
+
+    sqlite-vec 확장을 활용하여 벡터 유사도 검색을 지원하는 벡터 데이터베이스를 구현
+    텍스트 쿼리와 내용을 임베딩 벡터와 함께 저장하고, 유사도 기반 검색 기능을 제공
+    
+    Attributes:
+        db_filepath (str): SQLite 데이터베이스 파일 경로
+        embed (Callable[[str], List[float]]): 텍스트를 벡터로 변환하는 임베딩 함수
+        aembed (Optional[Callable[[str], Awaitable[List[float]]]]): 텍스트를 벡터로 변환하는 비동기 임베딩 함수
+        embedding_size (int): 임베딩 벡터의 차원 크기
+        vector_type (str): vec0 테이블에 저장하는 임베딩 벡터의 타입
+    """
+    
+    def __init__(self, db_filepath: str, embedding_size: Optional[int] = None, 
+                 embedding_function: Optional[Callable[[str], List[float]]] = None, 
+                 init_db: bool = False,
+                 async_embedding_function: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+                 vector_type: Optional[str] = None) -> None:
+        """SQLiteVecDB 클래스의 인스턴스를 초기화함
+        
+        Args:
+            db_filepath (str): SQLite 데이터베이스 파일 경로임
+            embedding_size (Optional[int], optional): 임베딩 벡터의 차원 크기임. 제공되지 않으면 자동 계산함
+            embedding_function (Optional[Callable[[str], List[float]]], optional): 텍스트를 벡터로 변환하는 함수
+            init_db (bool, optional): True이면 데이터베이스를 초기화함. 기본값은 False
+            async_embedding_function (Optional[Callable[[str], Awaitable[List[float]]]], optional): 텍스트를 벡터로 변환하는 비동기 함수. 없으면 embedding_function을 스레드에서 실행함
+            vector_type (Optional[str], optional): 임베딩 벡터 저장 타입임('float32' 또는 'int8'). None이면 기존 테이블의 타입을 따르고, 테이블이 없으면 'float32'
+        
+        Raises:
+            ValueError: 지원하지 않는 vector_type이 지정된 경우 발생함
+        """
+        super().__init__(db_filepath, embedding_size, embedding_function, async_embedding_function)
+        if vector_type is None:
+            vector_type = "float32" if init_db else self.detect_vector_type()
+        if vector_type not in VEC0_COLUMN_TYPES:
+            raise ValueError(f"지원하지 않는 vector_type: {vector_type} (지원: {', '.join(VEC0_COLUMN_TYPES)})")
+        self.vector_type = vector_type
+        
+        # 검색 SQL (sqlite3가 연결별로 컴파일된 구문을 캐시하도록 동일한 문자열을 재사용함)
+        # 자주 쓰는 k(1~MAX_SPECIALIZED_K)는 k를 상수로 넣은 구문을 미리 만들어 임베딩만 바인딩함 (key: (k, source 필터 여부), k=None은 k도 바인딩)
+        select_from = f"""SELECT content, {VEC0_DISTANCES[self.vector_type]} FROM vectors WHERE embedding MATCH {VEC0_BINDINGS[self.vector_type]}"""
+        self._search_sqls = {
+            (k, filtered): f"{select_from} AND k = {'?' if k is None else k}{' AND source = ?' if filtered else ''} ORDER BY distance ASC"
+            for k in [None, *range(1, MAX_SPECIALIZED_K + 1)] for filtered in (False, True)
+        }
+        
         # 완전 초기화
         if init_db:
             self.initialize_table(remove_old_table=True)
         
-    def connect_sqlitevec(self) -> sqlite3.Connection:
-        """sqlite-vec 확장을 로드한 SQLite 연결을 생성함
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """sqlite-vec 확장을 로드하고 CONNECTION_PRAGMAS를 적용한 SQLite 연결을 생성함
+        
+        Args:
+            check_same_thread (bool, optional): False이면 다른 스레드에서도 연결을 사용할 수 있음. 기본값은 True
         
         Returns:
             sqlite3.Connection: sqlite-vec 확장이 활성화된 데이터베이스 연결 객체
         """
-        db = sqlite3.connect(self.db_filepath)
+        db = sqlite3.connect(self.db_filepath, check_same_thread=check_same_thread)
+        for pragma in CONNECTION_PRAGMAS:
+            db.execute(pragma)
         db.enable_load_extension(True)
         sqlite_vec.load(db)
         db.enable_load_extension(False)
         return db
+
+    async def connect_async(self) -> aiosqlite.Connection:
+        """sqlite-vec 확장을 로드하고 CONNECTION_PRAGMAS를 적용한 비동기 SQLite 연결을 생성함
+        
+        Returns:
+            aiosqlite.Connection: sqlite-vec 확장이 활성화된 비동기 데이터베이스 연결 객체
+        """
+        db = await aiosqlite.connect(self.db_filepath)
+        for pragma in CONNECTION_PRAGMAS:
+            await db.execute(pragma)
+        await db.enable_load_extension(True)
+        await db.load_extension(sqlite_vec.loadable_path())
+        await db.enable_load_extension(False)
+        return db
+    
+    # 이전 이름 호환용
+    connect_sqlitevec = connect
+    
+    
+    def detect_vector_type(self) -> str:
+        """기존 vectors 테이블의 임베딩 컬럼 정의에서 vector_type을 판별함
+        
+        Returns:
+            str: 'int8' 또는 'float32' (테이블이 없으면 'float32')
+        """
+        db = sqlite3.connect(self.db_filepath)
+        row = db.execute("SELECT sql FROM sqlite_master WHERE name = 'vectors'").fetchone()
+        db.close()
+        if row is not None and "int8[" in row[0]:
+            return "int8"
+        return "float32"
+    
+    
+    def serialize(self, embedding: List[float]) -> bytes:
+        """임베딩 벡터를 vector_type에 맞는 BLOB으로 직렬화함
+        
+        저장 벡터와 쿼리 벡터 모두 L2 정규화한 뒤 직렬화함.
+        int8 타입이면 벡터별 스케일로 양자화함. 코사인 거리는 스케일에 영향을 받지 않으므로 쿼리도 같은 방식으로 양자화함
+        
+        Args:
+            embedding (List[float]): 직렬화할 임베딩 벡터임
+            
+        Returns:
+            bytes: vec0 테이블에 저장하거나 MATCH에 바인딩할 BLOB
+        """
+        if self.vector_type == "int8":
+            blob, _ = quantized_blob(embedding)
+            return blob
+        return normalized_blob(embedding)
     
 
     def initialize_table(self, remove_old_table: bool = False) -> None:
         """벡터 저장을 위한 테이블을 초기화함
         
-        임베딩 벡터, 쿼리, 콘텐츠, 타임스탬프를 저장하는 가상 테이블을 생성함
+        임베딩 벡터, 출처, 콘텐츠, 타임스탬프를 저장하는 가상 테이블을 생성함.
+        쿼리 텍스트는 임베딩에만 사용하고 검색 결과로 반환하지 않으므로 저장하지 않음.
+        source는 파티션 키로 저장하므로 source로 필터링한 검색은 해당 파티션의 벡터만 스캔함
         
         Args:
             remove_old_table (bool, optional): True이면 기존 테이블을 삭제함. 기본값은 False임
         """
-        db = self.connect_sqlitevec()
+        db = self.connect()
         # 기존 테이블 삭제 (존재할 경우)
         if remove_old_table:
             db.execute("DROP TABLE IF EXISTS vectors")
-        # 테이블이 없을 경우 생성
+        # 테이블이 없을 경우 생성 (int8 타입은 복원용 스케일 컬럼을 함께 저장함)
+        embedding_column = VEC0_COLUMN_TYPES[self.vector_type].format(dim=self.embedding_size)
+        scale_column = "+scale FLOAT," if self.vector_type == "int8" else ""
         db.execute(f'''
         CREATE VIRTUAL TABLE IF NOT EXISTS vectors USING vec0(
-           embedding float[{self.embedding_size}],
-           +query TEXT,
+           embedding {embedding_column},
+           source TEXT partition key,
            +content TEXT,
+           {scale_column}
            timestamp FLOAT
         )''')
         db.commit()
         db.close()
+        self._has_source = None
     
     
-    def add_one(self, query: str, content: str) -> None:
+    def add_one(self, query: str, content: str, source: Optional[str] = None) -> None:
         """단일 쿼리-콘텐츠 쌍을 데이터베이스에 추가함
         
-        쿼리 텍스트를 임베딩하고 관련 콘텐츠와 함께 데이터베이스에 저장함
+        쿼리 텍스트를 임베딩하고 관련 콘텐츠와 함께 데이터베이스에 저장함.
+        여러 쌍을 추가할 때는 연결과 트랜잭션을 한 번만 사용하는 add_many를 사용함
         
         Args:
             query (str): 임베딩할 쿼리 텍스트
             content (str): 쿼리와 연관된 콘텐츠 텍스트
+            source (Optional[str], optional): 콘텐츠의 출처임(검색 필터/파티션 키). None이면 NO_SOURCE로 저장함
         """
-        db = self.connect_sqlitevec()
-        embedding = self.embed(query)
-        embedding = embedding[:self.embedding_size]
-        timestamp = time.time()
-        db.execute('INSERT INTO vectors (embedding, query, content, timestamp) VALUES (?, ?, ?, ?)',
-                   (sqlite_vec.serialize_float32(embedding), query, content, timestamp))
-        db.commit()
-        db.close()
+        self.add_many([query], [content], [source])
+    
+    
+    def add_many(self, queries: List[str], contents: List[str], sources: Optional[List[Optional[str]]] = None) -> None:
+        """여러 쿼리-콘텐츠 쌍을 하나의 연결과 하나의 트랜잭션으로 데이터베이스에 추가함
+        
+        Args:
+            queries (List[str]): 임베딩할 쿼리 텍스트 리스트
+            contents (List[str]): 쿼리와 같은 순서의 콘텐츠 텍스트 리스트
+            sources (Optional[List[Optional[str]]], optional): 콘텐츠의 출처 리스트임(검색 필터/파티션 키). None인 출처는 NO_SOURCE로 저장함
+        
+        Raises:
+            ValueError: source 컬럼이 없는 기존 테이블에 출처를 저장하려는 경우 발생함
+        """
+        if sources is None:
+            sources = [None] * len(queries)
+        # source 컬럼이 없는 기존 테이블에도 저장할 수 있도록 테이블에 source 컬럼이 있는 경우만 컬럼에 포함함
+        has_source = self._has_source_column()
+        if not has_source and any(source is not None for source in sources):
+            self._require_source_column()
+        columns = ["content", "timestamp"]
+        if has_source:
+            columns.append("source")
+        if self.vector_type == "int8":
+            columns.append("scale")
+        placeholders = ", ".join("?" * len(columns))
+        sql = f'INSERT INTO vectors (embedding, {", ".join(columns)}) VALUES ({VEC0_BINDINGS[self.vector_type]}, {placeholders})'
+        
+        # 임베딩 API 오류로 중간에 실패해도 쓰기 트랜잭션을 열어 둔 채 기다리지 않도록 모든 임베딩을 먼저 계산함
+        rows = []
+        for query, content, source in zip(queries, contents, sources):
+            embedding = self.embed(query)
+            embedding = embedding[:self.embedding_size]
+            values = [content, time.time()]
+            if has_source:
+                # NULL 파티션 키는 행마다 청크를 만들므로 NO_SOURCE로 저장함
+                values.append(NO_SOURCE if source is None else source)
+            if self.vector_type == "int8":
+                # 스케일도 저장해야 하므로 serialize 대신 BLOB과 스케일을 함께 받음
+                embedding_blob, scale = quantized_blob(embedding)
+                values.append(scale)
+            else:
+                embedding_blob = self.serialize(embedding)
+            rows.append([embedding_blob, *values])
+        
+        db = self.connect()
+        try:
+            db.executemany(sql, rows)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
     
     
-    def get_all(self) -> pd.DataFrame:
+    def get_all(self) -> "pd.DataFrame":
         """데이터베이스에 저장된 모든 벡터 데이터를 반환함
         
         Returns:
-            pd.DataFrame: 임베딩, 쿼리, 콘텐츠, 타임스탬프를 포함하는 데이터프레임
+            pd.DataFrame: 임베딩, 콘텐츠, 타임스탬프를 포함하는 데이터프레임
         """
-        db = self.connect_sqlitevec()
-        query = "SELECT vec_to_json(embedding), query, content, timestamp FROM vectors ORDER BY timestamp ASC;"
+        import pandas as pd
+        
+        db = self.connect()
+        # int8 타입은 저장된 스케일을 곱해 근사 float 벡터로 복원함
+        scale_column = "scale" if self.vector_type == "int8" else "1.0"
+        query = f"SELECT vec_to_json(embedding), {scale_column}, content, timestamp FROM vectors ORDER BY timestamp ASC;"
         results = db.execute(query).fetchall()
         rows = []
-        for embed_str, query, content, timestamp in results:
+        for embed_str, scale, content, timestamp in results:
             embedding = json.loads(embed_str)
+            if self.vector_type == "int8":
+                embedding = [value * scale for value in embedding]
             row = {}
             row["embedding"] = embedding
-            row["query"] = query
             row["content"] = content
             row["timestamp"] = timestamp
             rows.append(row)
@@ -128,35 +691,342 @@ class SQLiteVecDB:
         return df
     
     
-    def search(self, query: str, k: int = 3) -> pd.DataFrame:
-        """쿼리와 유사한 상위 k개의 항목을 검색함
+    def _search_statement(self, embedding: List[float], k: int, source: Optional[str] = None) -> tuple:
+        """k-NN 검색 SQL과 바인딩 파라미터를 반환함
+        
+        k가 1~MAX_SPECIALIZED_K이면 k를 상수로 넣은 구문에 임베딩만 바인딩하고, 그 외에는 k도 바인딩함
         
         Args:
-            query (str): 검색할 쿼리 텍스트임
-            k (int, optional): 반환할 최대 항목 수임. 기본값은 3임
-            
+            embedding (List[float]): 검색할 쿼리 임베딩 벡터임
+            k (int): 반환할 최대 항목 수임
+            source (Optional[str], optional): 검색할 출처임. None이면 전체를 검색함
+        
         Returns:
-            pd.DataFrame: 검색 결과를 포함하는 데이터프레임 (컬럼: [order(index), query, content, distance])
+            tuple: (SQL 문자열, 바인딩 파라미터 리스트)
+        """
+        filtered = source is not None
+        params = [self.serialize(embedding)]
+        sql = self._search_sqls.get((k, filtered))
+        if sql is None:
+            sql = self._search_sqls[(None, filtered)]
+            params.append(k)
+        if filtered:
+            self._require_source_column()
+            params.append(source)
+        return sql, params
+
+
+
+class HNSWVecDB(BaseVecDB):
+    """HNSW 근사 최근접 이웃(ANN) 인덱스로 임베딩 벡터를 저장하고 검색하는 클래스
+
+    vectorlite 확장(hnswlib 기반)을 활용하여 전체 테이블을 스캔하는 sqlite-vec의 vec0 대신
+    HNSW 그래프 탐색으로 검색함. 벡터는 vectorlite 가상 테이블에, 쿼리와 콘텐츠는
+    rowid로 연결되는 별도의 테이블에 저장함. SQLiteVecDB와 동일한 인터페이스를 제공함
+
+    vectorlite는 vectors 테이블에 처음 접근할 때 인덱스 파일 전체를 메모리에 로드하고,
+    연결을 닫을 때 (query_only 연결이라도) 메모리의 인덱스를 파일에 다시 씀.
+    따라서 검색용 영구 연결은 인덱스 파일의 사본을 temp.vectors로 열고 사본을 바로 삭제하여 원본 파일에 쓰지 않고,
+    다른 연결이 인덱스 파일을 바꾸면(수정 시각/크기 변화) 새 사본으로 다시 엶
+
+    Attributes:
+        db_filepath (str): SQLite 데이터베이스 파일 경로
+        index_filepath (str): HNSW 인덱스 파일 경로
+        embed (Callable[[str], List[float]]): 텍스트를 벡터로 변환하는 임베딩 함수
+        aembed (Optional[Callable[[str], Awaitable[List[float]]]]): 텍스트를 벡터로 변환하는 비동기 임베딩 함수
+        embedding_size (int): 임베딩 벡터의 차원 크기
+        max_elements (int): HNSW 인덱스에 저장할 수 있는 최대 벡터 수
+        ef_search (Optional[int]): 검색 시 탐색할 후보 수. None이면 vectorlite 기본값을 사용
+    """
 
+    # source 컬럼은 vectorlite 가상 테이블이 아닌 콘텐츠 테이블에 저장함
+    SOURCE_TABLE = "contents"
+
+    def __init__(self, db_filepath: str, embedding_size: Optional[int] = None,
+                 embedding_function: Optional[Callable[[str], List[float]]] = None,
+                 init_db: bool = False,
+                 async_embedding_function: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+                 index_filepath: Optional[str] = None,
+                 max_elements: int = 100000, M: int = 16, ef_construction: int = 64,
+                 ef_search: Optional[int] = None) -> None:
+        """HNSWVecDB 클래스의 인스턴스를 초기화함
+
+        Args:
+            db_filepath (str): SQLite 데이터베이스 파일 경로임
+            embedding_size (Optional[int], optional): 임베딩 벡터의 차원 크기임. 제공되지 않으면 자동 계산함
+            embedding_function (Optional[Callable[[str], List[float]]], optional): 텍스트를 벡터로 변환하는 함수
+            init_db (bool, optional): True이면 데이터베이스를 초기화함. 기본값은 False
+            async_embedding_function (Optional[Callable[[str], Awaitable[List[float]]]], optional): 텍스트를 벡터로 변환하는 비동기 함수. 없으면 embedding_function을 스레드에서 실행함
+            index_filepath (Optional[str], optional): HNSW 인덱스 파일 경로임. 기본값은 '{db_filepath}.hnsw'
+            max_elements (int, optional): 인덱스의 최대 벡터 수임. 기본값은 100000
+            M (int, optional): HNSW 그래프의 노드당 최대 연결 수임. 기본값은 16
+            ef_construction (int, optional): 인덱스 생성 시 탐색할 후보 수임. 기본값은 64
+            ef_search (Optional[int], optional): 검색 시 탐색할 후보 수임. 기본값은 None
         """
-        db = self.connect_sqlitevec()
-        
-        embedding = self.embed(query)
-        embedding = embedding[:self.embedding_size]
-        
-        results = db.execute(
-                  """SELECT query, content, distance FROM vectors WHERE embedding MATCH ? AND k = ? ORDER BY distance ASC""",
-                   [sqlite_vec.serialize_float32(embedding), k]
-        ).fetchall()
+        super().__init__(db_filepath, embedding_size, embedding_function, async_embedding_function)
+        self.index_filepath = index_filepath or f"{db_filepath}.hnsw"
+        self.max_elements = max_elements
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        # 인덱스 파일은 쓰기 연결을 닫을 때 통째로 저장되므로 인스턴스 안의 쓰기 연결은 하나씩만 엶
+        self._write_lock = threading.Lock()
+
+        # 완전 초기화
+        if init_db:
+            self.initialize_table(remove_old_table=True)
+
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """vectorlite 확장을 로드하고 CONNECTION_PRAGMAS를 적용한 SQLite 연결을 생성함
+
+        Args:
+            check_same_thread (bool, optional): False이면 다른 스레드에서도 연결을 사용할 수 있음. 기본값은 True
+
+        Returns:
+            sqlite3.Connection: vectorlite 확장이 활성화된 데이터베이스 연결 객체
+        """
+        db = sqlite3.connect(self.db_filepath, check_same_thread=check_same_thread)
+        for pragma in CONNECTION_PRAGMAS:
+            db.execute(pragma)
+        db.enable_load_extension(True)
+        db.load_extension(vectorlite_py.vectorlite_path())
+        db.enable_load_extension(False)
+        return db
+
+    async def connect_async(self) -> aiosqlite.Connection:
+        """vectorlite 확장을 로드하고 CONNECTION_PRAGMAS를 적용한 비동기 SQLite 연결을 생성함
+
+        Returns:
+            aiosqlite.Connection: vectorlite 확장이 활성화된 비동기 데이터베이스 연결 객체
+        """
+        db = await aiosqlite.connect(self.db_filepath)
+        for pragma in CONNECTION_PRAGMAS:
+            await db.execute(pragma)
+        await db.enable_load_extension(True)
+        await db.load_extension(vectorlite_py.vectorlite_path())
+        await db.enable_load_extension(False)
+        return db
+
+    def _index_version(self) -> Optional[Tuple[int, int]]:
+        """HNSW 인덱스 파일의 (수정 시각(ns), 크기)를 반환함 (파일이 없으면 None)
+
+        인덱스 파일은 쓰기 연결을 닫을 때 저장되므로 이 값이 바뀌면 검색 연결을 새 사본으로 다시 엶
+        """
+        try:
+            stat = os.stat(self.index_filepath)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _snapshot_index(self) -> Tuple[Optional[str], Optional[str]]:
+        """HNSW 인덱스 파일을 임시 디렉토리에 복사하고 사본을 temp.vectors로 여는 SQL을 반환함
+
+        temp.vectors는 같은 이름의 main.vectors를 가리므로 검색 SQL을 바꾸지 않아도 사본을 검색함.
+        SQL 실행 직후 임시 디렉토리를 삭제하므로 연결을 닫을 때(또는 gc될 때) vectorlite가 인덱스를 저장할 경로가 없어
+        원본 인덱스 파일에도, 임시 디렉토리에도 쓰지 않음
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (temp.vectors를 생성하는 SQL, 임시 디렉토리 경로). vectors 테이블이 없으면 (None, None)
+
+        Raises:
+            ValueError: vectors 테이블 정의에서 인덱스 파일 경로를 찾을 수 없는 경우 발생함
+        """
+        db = sqlite3.connect(self.db_filepath)
+        row = db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'vectors'").fetchone()
         db.close()
+        if row is None:
+            return None, None
+        snapshot_dir = tempfile.mkdtemp(prefix="hnsw_")
+        index_copy = os.path.join(snapshot_dir, os.path.basename(self.index_filepath))
+        # 복사하는 동안 쓰기 연결이 인덱스 파일을 저장하면 다시 복사함 (인덱스 파일이 아직 없으면 vectorlite가 빈 인덱스로 엶)
+        for _ in range(3):
+            version = self._index_version()
+            if version is None:
+                break
+            shutil.copyfile(self.index_filepath, index_copy)
+            if self._index_version() == version:
+                break
+        # 저장된 DDL(CREATE VIRTUAL TABLE vectors USING vectorlite(..., '인덱스 경로'))의 테이블 이름과 인덱스 경로를 바꿈
+        # DDL 형식이 달라 인덱스 경로를 바꾸지 못하면 사본 대신 원본 인덱스를 열게 되므로 오류를 발생시킴
+        parts = re.split(r"\bUSING\b", row[0], maxsplit=1, flags=re.IGNORECASE)
+        escaped_copy = index_copy.replace("'", "''")
+        module_args, replaced = re.subn(r"'(?:[^']|'')*'(\s*\)\s*)$", lambda m: f"'{escaped_copy}'{m.group(1)}", parts[-1])
+        if len(parts) != 2 or replaced != 1:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            raise ValueError(f"vectors 테이블 정의에서 인덱스 파일 경로를 찾을 수 없음: {row[0]}")
+        return f"CREATE VIRTUAL TABLE temp.vectors USING{module_args}", snapshot_dir
+
+    def initialize_table(self, remove_old_table: bool = False) -> None:
+        """벡터 저장을 위한 HNSW 가상 테이블과 콘텐츠 테이블을 초기화함
+
+        Args:
+            remove_old_table (bool, optional): True이면 기존 테이블과 인덱스 파일을 삭제함. 기본값은 False임
+        """
+        # 기존 테이블을 연 연결도 닫을 때 인덱스 파일을 저장하므로 add_many와 같이 _write_lock으로 직렬화함
+        with self._write_lock:
+            db = self.connect()
+            try:
+                # 기존 테이블 삭제 (존재할 경우)
+                if remove_old_table:
+                    db.execute("DROP TABLE IF EXISTS vectors")
+                    db.execute("DROP TABLE IF EXISTS contents")
+                    if os.path.exists(self.index_filepath):
+                        os.remove(self.index_filepath)
+                # 테이블이 없을 경우 생성 (인덱스 파일은 연결 종료 시 저장됨)
+                index_filepath = self.index_filepath.replace("'", "''")
+                db.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS vectors USING vectorlite(
+                   embedding float32[{self.embedding_size}] ip,
+                   hnsw(max_elements={self.max_elements}, M={self.M}, ef_construction={self.ef_construction}),
+                   '{index_filepath}'
+                )''')
+                db.execute('''
+                CREATE TABLE IF NOT EXISTS contents(
+                   rowid INTEGER PRIMARY KEY,
+                   source TEXT,
+                   content TEXT,
+                   timestamp FLOAT
+                )''')
+                # source 필터 검색 시 후보 rowid를 인덱스로 찾음
+                db.execute("CREATE INDEX IF NOT EXISTS contents_source ON contents(source)")
+                db.commit()
+            finally:
+                db.close()
+        self._has_source = None
+
+
+    def add_one(self, query: str, content: str, source: Optional[str] = None) -> None:
+        """단일 쿼리-콘텐츠 쌍을 데이터베이스에 추가함
+
+        호출할 때마다 인덱스 파일 전체를 로드하고 다시 저장하므로(O(N)) 여러 쌍을 추가할 때는 add_many를 사용함
+
+        Args:
+            query (str): 임베딩할 쿼리 텍스트
+            content (str): 쿼리와 연관된 콘텐츠 텍스트
+            source (Optional[str], optional): 콘텐츠의 출처임(검색 필터). None이면 NO_SOURCE로 저장함
+        """
+        self.add_many([query], [content], [source])
+
+
+    def add_many(self, queries: List[str], contents: List[str], sources: Optional[List[Optional[str]]] = None) -> None:
+        """여러 쿼리-콘텐츠 쌍을 하나의 쓰기 연결로 데이터베이스에 추가함
+
+        vectorlite는 연결에서 vectors 테이블에 처음 접근할 때 인덱스 파일 전체를 로드하고
+        연결을 닫을 때만 인덱스 파일을 저장함. 따라서 한 번의 호출로 추가하면 인덱스 로드/저장이 한 번씩만 일어남.
+        인덱스 파일은 마지막에 닫힌 연결의 내용으로 덮어써지므로 동시에 여러 쓰기 연결(프로세스)을 사용하면 안 됨.
+        같은 인스턴스 안의 쓰기는 _write_lock으로 직렬화함.
+        vectorlite는 롤백한 벡터도 메모리 인덱스에 남긴 채 연결을 닫을 때 저장하므로,
+        쓰기 전 인덱스 파일을 백업해 두고 추가 중 오류가 나면 콘텐츠 테이블을 롤백하고 인덱스 파일을 백업으로 되돌림
+
+        Args:
+            queries (List[str]): 임베딩할 쿼리 텍스트 리스트
+            contents (List[str]): 쿼리와 같은 순서의 콘텐츠 텍스트 리스트
+            sources (Optional[List[Optional[str]]], optional): 콘텐츠의 출처 리스트임(검색 필터). None인 출처는 SQLiteVecDB와 같이 NO_SOURCE로 저장함
         
-        cols = ["query", "content", "distance"]
-        df = pd.DataFrame(results, columns=cols)
-        df.index += 1
-        df.index.name = "order"
+        Raises:
+            ValueError: source 컬럼이 없는 기존 테이블에 출처를 저장하려는 경우 발생함
+        """
+        if sources is None:
+            sources = [None] * len(queries)
+        # source 컬럼이 없는 기존 테이블에도 저장할 수 있도록 테이블에 source 컬럼이 있는 경우만 컬럼에 포함함
+        has_source = self._has_source_column()
+        if not has_source and any(source is not None for source in sources):
+            self._require_source_column()
+        # 임베딩 API 오류로 중간에 실패해도 인덱스에 일부 벡터만 남지 않도록 모든 임베딩을 먼저 계산함
+        blobs = [normalized_blob(self.embed(query)[:self.embedding_size]) for query in queries]
+        with self._write_lock:
+            backup_filepath = f"{self.index_filepath}.bak"
+            # 수정 시각/크기도 복사하여 복원한 인덱스를 읽는 검색 연결이 불필요하게 다시 열리지 않게 함
+            has_backup = os.path.exists(self.index_filepath)
+            if has_backup:
+                shutil.copy2(self.index_filepath, backup_filepath)
+            db = self.connect()
+            try:
+                for blob, content, source in zip(blobs, contents, sources):
+                    timestamp = time.time()
+                    if has_source:
+                        cursor = db.execute('INSERT INTO contents (source, content, timestamp) VALUES (?, ?, ?)',
+                                            (NO_SOURCE if source is None else source, content, timestamp))
+                    else:
+                        cursor = db.execute('INSERT INTO contents (content, timestamp) VALUES (?, ?)',
+                                            (content, timestamp))
+                    db.execute('INSERT INTO vectors (rowid, embedding) VALUES (?, ?)', (cursor.lastrowid, blob))
+                db.commit()
+            except BaseException:
+                db.rollback()
+                # 닫을 때 저장되는 일부만 추가된 인덱스를 쓰기 전 인덱스로 되돌림 (쓰기 전 인덱스 파일이 없었으면 삭제함)
+                db.close()
+                if has_backup:
+                    os.replace(backup_filepath, self.index_filepath)
+                elif os.path.exists(self.index_filepath):
+                    os.remove(self.index_filepath)
+                raise
+            # 연결을 닫을 때 인덱스 파일이 저장됨
+            db.close()
+            if has_backup:
+                os.remove(backup_filepath)
+
+
+    def get_all(self) -> "pd.DataFrame":
+        """데이터베이스에 저장된 모든 벡터 데이터를 반환함
+
+        Returns:
+            pd.DataFrame: 임베딩, 콘텐츠, 타임스탬프를 포함하는 데이터프레임
+        """
+        import pandas as pd
+
+        # 이 연결도 닫을 때 인덱스 파일을 저장하므로 쓰기 중인 인덱스를 이전 내용으로 덮어쓰지 않도록 _write_lock으로 직렬화함
+        with self._write_lock:
+            db = self.connect()
+            try:
+                results = db.execute("SELECT rowid, content, timestamp FROM contents ORDER BY timestamp ASC;").fetchall()
+                rows = []
+                for rowid, content, timestamp in results:
+                    # HNSW 가상 테이블은 전체 스캔을 지원하지 않으므로 rowid로 벡터를 조회함
+                    embed_str, = db.execute("SELECT vector_to_json(embedding) FROM vectors WHERE rowid = ?", [rowid]).fetchone()
+                    row = {}
+                    row["embedding"] = json.loads(embed_str)
+                    row["content"] = content
+                    row["timestamp"] = timestamp
+                    rows.append(row)
+            finally:
+                db.close()
+
+        df = pd.DataFrame(rows)
         return df
 
 
+    def _search_statement(self, embedding: List[float], k: int, source: Optional[str] = None) -> tuple:
+        """HNSW k-NN 검색 SQL과 바인딩 파라미터를 생성함
+
+        source가 주어지면 해당 출처의 rowid만 후보로 HNSW 탐색을 수행함 (vectorlite의 rowid IN 사전 필터)
+
+        Args:
+            embedding (List[float]): 검색할 쿼리 임베딩 벡터임
+            k (int): 반환할 최대 항목 수임
+            source (Optional[str], optional): 검색할 출처임. None이면 전체를 검색함
+
+        Returns:
+            tuple: (SQL 문자열, 바인딩 파라미터 리스트)
+        """
+        # 저장 벡터가 정규화되어 있으므로 쿼리도 정규화하면 내적 거리(1 - dot)가 코사인 거리와 같음
+        blob = normalized_blob(embedding)
+        if self.ef_search is None:
+            knn_param, params = "knn_param(?, ?)", [blob, k]
+        else:
+            knn_param, params = "knn_param(?, ?, ?)", [blob, k, self.ef_search]
+        source_filter = ""
+        if source is not None:
+            self._require_source_column()
+            source_filter = " AND rowid IN (SELECT rowid FROM contents WHERE source = ?)"
+            params.append(source)
+        sql = f"""SELECT c.content, v.distance
+                  FROM (SELECT rowid, distance FROM vectors WHERE knn_search(embedding, {knn_param}){source_filter}) v
+                  JOIN contents c ON c.rowid = v.rowid
+                  ORDER BY v.distance ASC"""
+        return sql, params
+
+
 
 # def get_sqlite_db_path(db_file_name: Optional[str] = None) -> str:
 #     """SQLite 데이터베이스 파일 경로를 반환함
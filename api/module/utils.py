@@ -1,6 +1,9 @@
 
 # - SQLite DB 파일명 규칙(v1) `RAGDB_{날짜-YYYYMMDD}_{시간-HHMM}_{source}_{model}_nrows{행 개수}_njobs{채용공고수}.sqlite`
 import datetime
+from typing import List
+
+import numpy as np
 
 def get_db_filename(source: str, model: str, nrows: int, njobs: int, string: str = "") -> str:
     """SQLite DB 파일명을 생성함
@@ -25,3 +28,17 @@ def get_db_filename(source: str, model: str, nrows: int, njobs: int, string: str
     db_filename = db_filename.replace("/", "_")
     return db_filename
 
+
+def normalize_l2(embedding: List[float]) -> np.ndarray:
+    """임베딩 벡터를 L2 정규화한 float32 배열로 변환함
+
+    Args:
+        embedding (List[float]): 정규화할 임베딩 벡터임
+
+    Returns:
+        np.ndarray: 노름이 1인 리틀 엔디언 float32 배열
+    """
+    # 입력을 한 번만 복사한 배열에서 제자리 스케일링함 (나눗셈 결과용 배열을 따로 만들지 않음)
+    vector = np.array(embedding, dtype="<f4")
+    vector *= 1.0 / (np.linalg.norm(vector) + 1e-12)
+    return vector
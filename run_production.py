@@ -1,3 +1,6 @@
+import os
+import warnings
+
 import uvicorn
 # from dotenv import load_dotenv
 
@@ -5,9 +8,30 @@ if __name__ == "__main__":
     # load_dotenv(".env")  
     # NOTE: 환경변수는 별도로 설정해야 함
 
+    # 워커 프로세스 수 (기본값: sqlitevec는 CPU 코어 수, hnsw는 1)
+    # sqlitevec: 각 워커가 같은 DB 파일을 mmap으로 읽으므로 페이지 캐시를 공유함
+    # hnsw: 각 워커가 HNSW 인덱스 전체를 자신의 메모리에 따로 로드하므로(워커 수만큼 메모리 사용) 기본 1개로 실행함.
+    #       워커의 검색 연결은 인덱스 사본을 읽기만 하므로 WORKERS를 직접 지정해 여러 워커로 실행해도 인덱스 파일에 쓰지 않음
+    vector_db_backend = os.getenv("VECTOR_DB_BACKEND", "sqlitevec").lower()
+    default_workers = 1 if vector_db_backend == "hnsw" else (os.cpu_count() or 1)
+    workers = int(os.getenv("WORKERS", default_workers))
+    # 워커들이 임베딩 API 동시 요청 수(EMBEDDING_MAX_IN_FLIGHT)를 나눠 가질 수 있도록 워커 수를 전달함.
+    # WORKERS는 .env에 남아 있어도 run_dev.py(단일 프로세스)에서 무시되도록 별도 변수로 전달함
+    os.environ["RAG_API_WORKERS"] = str(workers)
+    # 워커별 한도는 최소 1이므로 워커 수가 전체 한도보다 많으면 실제 동시 요청 수는 워커 수가 됨
+    max_in_flight = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "5"))
+    if workers > max_in_flight:
+        warnings.warn(
+            f"워커 수({workers})가 EMBEDDING_MAX_IN_FLIGHT({max_in_flight})보다 많아 "
+            f"임베딩 API 동시 요청 수가 최대 {workers}개가 됨. WORKERS 또는 EMBEDDING_MAX_IN_FLIGHT를 조정하세요"
+        )
+
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=80,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
         reload=False  # 개발 중 코드 변경 시 자동 재시작
-    )
\ No newline at end of file
+    )
@@ -117,7 +117,37 @@ class TestRAGAPI(unittest.TestCase):
         self.assertEqual(data["query"], params["query"])
         
         print(f"✅ GET 검색 엔드포인트 테스트 성공 - {params['k']}개 결과 반환됨")
-    
+
+    def test_search_batch_endpoint(self):
+        """배치 검색 엔드포인트 테스트함"""
+        if not self.api_running:
+            self.skipTest("API 서버가 실행 중이지 않음")
+
+        # 배치 요청 데이터 준비함
+        payload = [
+            {"query": "백엔드 개발자 채용", "k": 2},
+            {"query": "데이터 사이언티스트", "k": 1}
+        ]
+
+        # POST 요청 전송함
+        response = requests.post(
+            f"{self.BASE_URL}/v1/search/batch",
+            json=payload
+        )
+
+        # 응답 코드 확인함
+        self.assertEqual(response.status_code, 200)
+
+        # 요청 순서대로 응답이 반환되는지 확인함
+        data = response.json()
+        self.assertEqual(len(data), len(payload))
+        for item, request in zip(data, payload):
+            self.assertEqual(item["query"], request["query"])
+            self.assertEqual(item["count"], request["k"])
+            self.assertEqual(len(item["results"]), request["k"])
+
+        print(f"✅ 배치 검색 엔드포인트 테스트 성공 - {len(payload)}개 쿼리 처리됨")
+
     def test_error_handling(self):
         """오류 처리 테스트함"""
         if not self.api_running:
@@ -0,0 +1,182 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 프로젝트 루트 디렉토리를 모듈 검색 경로에 추가함
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.module.embedding import Embedding
+
+
+class FakeResponse:
+    """오류 응답의 상태 코드와 헤더만 가진 응답"""
+
+    def __init__(self, status_code: int, headers: dict) -> None:
+        self.status_code = status_code
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    """상태 코드와 Retry-After 헤더를 가진 API 오류"""
+
+    def __init__(self, status_code: int, retry_after: str = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(status_code, {"retry-after": retry_after} if retry_after else {})
+
+
+class APIConnectionError(Exception):
+    """openai.APIConnectionError와 같은 이름의 연결 오류"""
+
+
+class APITimeoutError(APIConnectionError):
+    """openai.APITimeoutError와 같은 이름의 타임아웃 오류"""
+
+
+class ResourceExhausted(Exception):
+    """Google gRPC의 요청 한도 초과 오류"""
+
+
+class ServiceUnavailable(Exception):
+    """Google gRPC의 서비스 불가 오류"""
+
+
+def google_error(cause: Exception) -> Exception:
+    """GoogleGenerativeAIError처럼 gRPC 오류를 __cause__로 감싼 오류를 반환함"""
+    error = Exception("Error embedding content")
+    error.__cause__ = cause
+    return error
+
+
+class FakeRequest:
+    """호출할 때마다 errors의 오류를 차례로 발생시키고, 모두 발생시킨 뒤에는 result를 반환하는 요청"""
+
+    def __init__(self, errors: list, result=None) -> None:
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+    async def acall(self):
+        return self()
+
+
+class FakeEmbeddings:
+    """embed_query/embed_documents가 요청별 FakeRequest를 거치는 LangChain 임베딩 객체"""
+
+    def __init__(self, errors: list) -> None:
+        self.request = FakeRequest(errors)
+
+    def embed_query(self, query):
+        self.request()
+        return [float(len(query))]
+
+    def embed_documents(self, queries):
+        self.request()
+        return [[float(len(query))] for query in queries]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestRequestRetry(unittest.TestCase):
+    """Embedding._request/_arequest의 재시도/백오프/Retry-After/제한 시간 테스트 클래스"""
+
+    def setUp(self):
+        self.embedding = Embedding(api_key="key", source="openai", max_retries=3, retry_deadline=30.0)
+        # 실제로 기다리지 않고 대기 시간만 기록함
+        self.sleeps = []
+        sleep_patch = mock.patch("api.module.embedding.time.sleep", side_effect=self.sleeps.append)
+        asleep_patch = mock.patch("api.module.embedding.asyncio.sleep", new=self._asleep)
+        jitter_patch = mock.patch("api.module.embedding.random.uniform", return_value=0.5)
+        for patch in (sleep_patch, asleep_patch, jitter_patch):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def _asleep(self, delay):
+        self.sleeps.append(delay)
+
+    def test_retry_with_backoff(self):
+        """429/5xx 오류는 지수 백오프(1, 2, ...초 + 지터) 후 다시 요청하는지 확인함"""
+        request = FakeRequest([FakeAPIError(429), FakeAPIError(503)], result="ok")
+        self.assertEqual(self.embedding._request(request), "ok")
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(self.sleeps, [1.5, 2.5])
+
+    def test_async_retry_with_backoff(self):
+        """비동기 요청도 같은 정책으로 재시도하는지 확인함"""
+        request = FakeRequest([FakeAPIError(500), FakeAPIError(429)], result="ok")
+        self.assertEqual(run(self.embedding._arequest(request.acall)), "ok")
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(self.sleeps, [1.5, 2.5])
+
+    def test_retry_after(self):
+        """Retry-After 헤더가 있으면 백오프 대신 헤더 값만큼 기다리는지 확인함"""
+        request = FakeRequest([FakeAPIError(429, retry_after="7")], result="ok")
+        self.assertEqual(self.embedding._request(request), "ok")
+        self.assertEqual(self.sleeps, [7.0])
+
+    def test_not_retryable(self):
+        """400 오류와 Google ServiceUnavailable(클라이언트가 이미 재시도함)은 재시도하지 않는지 확인함"""
+        for error in (FakeAPIError(400), google_error(ServiceUnavailable())):
+            request = FakeRequest([error], result="ok")
+            with self.assertRaises(Exception) as ctx:
+                self.embedding._request(request)
+            self.assertIs(ctx.exception, error)
+            self.assertEqual(request.calls, 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_connection_errors_and_google_errors_are_retried(self):
+        """연결 오류/타임아웃과 Google ResourceExhausted는 재시도하는지 확인함"""
+        request = FakeRequest([APIConnectionError(), APITimeoutError(), google_error(ResourceExhausted())], result="ok")
+        self.assertEqual(self.embedding._request(request), "ok")
+        self.assertEqual(request.calls, 4)
+
+    def test_max_retries(self):
+        """max_retries번 재시도한 뒤에도 실패하면 마지막 오류를 전달하는지 확인함"""
+        errors = [FakeAPIError(429) for _ in range(5)]
+        request = FakeRequest(errors, result="ok")
+        with self.assertRaises(FakeAPIError):
+            run(self.embedding._arequest(request.acall))
+        self.assertEqual(request.calls, 4)
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_retry_deadline_stops_waiting(self):
+        """기다린 뒤 다시 요청할 시간이 retry_deadline 안에 남지 않으면 기다리지 않고 오류를 전달하는지 확인함"""
+        self.embedding.retry_deadline = 5.0
+        for call in (self.embedding._request, lambda request: run(self.embedding._arequest(request.acall))):
+            request = FakeRequest([FakeAPIError(429, retry_after="10")], result="ok")
+            with self.assertRaises(FakeAPIError):
+                call(request)
+            self.assertEqual(request.calls, 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_async_deadline_cancels_slow_request(self):
+        """비동기 요청이 retry_deadline 안에 끝나지 않으면 asyncio.TimeoutError를 발생시키는지 확인함"""
+        self.embedding.retry_deadline = 0.05
+
+        async def hang():
+            await asyncio.Event().wait()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            run(self.embedding._arequest(hang))
+
+    def test_sync_embed_retries(self):
+        """동기 embed/embed_batch도 재시도 정책을 거치는지 확인함"""
+        fake = FakeEmbeddings([FakeAPIError(429), FakeAPIError(429)])
+        self.embedding._langchain_embeddings = fake
+        self.assertEqual(self.embedding.embed("abc"), [3.0])
+        self.assertEqual(self.embedding.embed_batch(["a", "bb"]), [[1.0], [2.0]])
+        self.assertEqual(fake.request.calls, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
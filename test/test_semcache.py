@@ -0,0 +1,134 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트 디렉토리를 모듈 검색 경로에 추가함
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.module.semcache import VecStore, SemanticCache
+from api.module.utils import normalize_l2
+
+
+def unit(index: int, dim: int = 8) -> list:
+    """index번째 축 방향의 단위 벡터를 반환함"""
+    vector = [0.0] * dim
+    vector[index] = 1.0
+    return vector
+
+
+class FakeTimer:
+    """테스트에서 시간을 직접 진행시키는 타이머"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestVecStore(unittest.TestCase):
+    """VecStore의 행 추가/용량 증가/유사도 계산 테스트 클래스"""
+
+    def test_add_grows_capacity_up_to_max(self):
+        """용량이 부족하면 두 배로 늘리되 max_capacity를 넘지 않는지 확인함"""
+        store = VecStore(capacity=2, max_capacity=5)
+        for i in range(5):
+            self.assertEqual(store.add(normalize_l2(unit(i)), i), i)
+        self.assertEqual(len(store), 5)
+        self.assertEqual(store.mat.shape, (5, 8))
+        self.assertEqual(store.ids, [0, 1, 2, 3, 4])
+
+    def test_scores(self):
+        """저장된 행과 쿼리의 코사인 유사도를 전체/일부 행에 대해 계산하는지 확인함"""
+        store = VecStore(capacity=1)
+        self.assertEqual(store.scores(normalize_l2(unit(0))).shape, (0,))
+        store.add(normalize_l2([1.0, 0.0]), 0)
+        store.add(normalize_l2([1.0, 1.0]), 1)
+        query = normalize_l2([2.0, 0.0])
+        np.testing.assert_allclose(store.scores(query), [1.0, np.sqrt(0.5)], rtol=1e-6)
+        np.testing.assert_allclose(store.scores(query, rows=np.array([1])), [np.sqrt(0.5)], rtol=1e-6)
+
+    def test_replace(self):
+        """행의 벡터와 ID를 교체하는지 확인함"""
+        store = VecStore()
+        store.add(normalize_l2(unit(0)), 7)
+        store.replace(0, normalize_l2(unit(1)), 9)
+        self.assertEqual(store.ids, [9])
+        np.testing.assert_allclose(store.scores(normalize_l2(unit(1))), [1.0])
+
+
+class TestSemanticCache(unittest.TestCase):
+    """SemanticCache의 적중 판단/LRU 제거/LSH 버킷/TTL 만료 테스트 클래스"""
+
+    def test_threshold(self):
+        """유사도가 임계값 이상이면 적중하고 미만이면 적중하지 않는지 확인함"""
+        cache = SemanticCache(max_size=10, threshold=0.95)
+        self.assertIsNone(cache.get(unit(0), k=1))
+        cache.set(unit(0), k=3, response="a")
+        self.assertEqual(cache.get([1.0, 0.1] + [0.0] * 6, k=3), "a")
+        self.assertIsNone(cache.get([1.0, 1.0] + [0.0] * 6, k=3))
+
+    def test_k(self):
+        """요청한 k보다 적은 결과를 가진 항목은 적중하지 않는지 확인함"""
+        cache = SemanticCache(max_size=10)
+        cache.set(unit(0), k=3, response="a")
+        self.assertEqual(cache.get(unit(0), k=2), "a")
+        self.assertIsNone(cache.get(unit(0), k=5))
+
+    def test_lru_eviction(self):
+        """항목 수가 max_size를 넘으면 가장 오래 사용되지 않은 항목을 제거하는지 확인함"""
+        cache = SemanticCache(max_size=2)
+        cache.set(unit(0), k=1, response="a")
+        cache.set(unit(1), k=1, response="b")
+        self.assertEqual(cache.get(unit(0), k=1), "a")  # a를 최근 사용으로 갱신함
+        cache.set(unit(2), k=1, response="c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(unit(0), k=1), "a")
+        self.assertIsNone(cache.get(unit(1), k=1))
+        self.assertEqual(cache.get(unit(2), k=1), "c")
+
+    def test_lsh_buckets(self):
+        """LSH 사용 시 같은 벡터는 적중하고 재사용한 슬롯이 이전 버킷에서 빠지는지 확인함"""
+        cache = SemanticCache(max_size=3, n_planes=8, seed=1)
+        for i in range(5):
+            cache.set(unit(i), k=1, response=i)
+        for i in range(2, 5):
+            self.assertEqual(cache.get(unit(i), k=1), i)
+        self.assertIsNone(cache.get(unit(0), k=1))
+        # 모든 슬롯이 정확히 자신의 버킷 하나에만 속해야 함
+        members = sorted(slot for slots in cache._buckets.values() for slot in slots)
+        self.assertEqual(members, [0, 1, 2])
+        for slot, bucket in enumerate(cache._slot_buckets):
+            self.assertIn(slot, cache._buckets[bucket])
+
+    def test_ttl(self):
+        """ttl이 지난 항목은 적중하지 않고, 새 항목 저장 시 만료된 슬롯을 먼저 재사용하는지 확인함"""
+        timer = FakeTimer()
+        cache = SemanticCache(max_size=2, ttl=10, timer=timer)
+        cache.set(unit(0), k=1, response="a")
+        timer.now = 5
+        cache.set(unit(1), k=1, response="b")
+        self.assertEqual(cache.get(unit(0), k=1), "a")  # a를 최근 사용으로 갱신함
+        timer.now = 11
+        self.assertIsNone(cache.get(unit(0), k=1))
+        # LRU 순서로는 b가 먼저 제거되어야 하지만 만료된 a의 슬롯을 재사용함
+        cache.set(unit(2), k=1, response="c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(unit(1), k=1), "b")
+        self.assertEqual(cache.get(unit(2), k=1), "c")
+        timer.now = 100
+        self.assertIsNone(cache.get(unit(2), k=1))
+
+    def test_no_ttl(self):
+        """ttl이 None이면 시간이 지나도 항목이 만료되지 않는지 확인함"""
+        timer = FakeTimer()
+        cache = SemanticCache(max_size=2, timer=timer)
+        cache.set(unit(0), k=1, response="a")
+        timer.now = 1e9
+        self.assertEqual(cache.get(unit(0), k=1), "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# 프로젝트 루트 디렉토리를 모듈 검색 경로에 추가함
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.module import sqlitevec
+from api.module.sqlitevec import HNSWVecDB
+
+DIM = 8
+
+
+def fake_embed(query: str) -> list:
+    """쿼리 문자열마다 고정된 난수 벡터를 반환하는 임베딩 함수"""
+    rng = np.random.default_rng(sum(map(ord, query)))
+    return rng.normal(size=DIM).tolist()
+
+
+def index_state(path: str) -> tuple:
+    """인덱스 파일의 (수정 시각(ns), 크기, 내용)을 반환함"""
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        return stat.st_mtime_ns, stat.st_size, f.read()
+
+
+class TestHNSWSnapshot(unittest.TestCase):
+    """HNSWVecDB 검색 연결의 인덱스 사본 읽기/쓰기 후 다시 열기/원본 인덱스 보존 테스트 클래스"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.db = HNSWVecDB(os.path.join(self.dir, "test.db"), embedding_size=DIM,
+                            embedding_function=fake_embed, init_db=True)
+        self.db.add_many([f"q{i}" for i in range(20)], [f"c{i}" for i in range(20)])
+        # 검색 연결이 만든 임시 디렉토리를 기록함
+        self.snapshot_dirs = []
+        mkdtemp = tempfile.mkdtemp
+
+        def recording_mkdtemp(*args, **kwargs):
+            path = mkdtemp(*args, **kwargs)
+            self.snapshot_dirs.append(path)
+            return path
+
+        patch = mock.patch.object(sqlitevec.tempfile, "mkdtemp", side_effect=recording_mkdtemp)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        asyncio.run(self.db.aclose())
+
+    def test_snapshot_search_leaves_index_untouched(self):
+        """동기/비동기 검색 연결이 사본을 검색하고, 연결을 닫아도 원본 인덱스 파일에 쓰지 않는지 확인함"""
+        before = index_state(self.db.index_filepath)
+        self.assertEqual(self.db.search("q3", k=1)[0][0], "c3")
+        self.assertEqual(asyncio.run(self.db.asearch("q5", k=1))[0][0], "c5")
+        asyncio.run(self.db.aclose())
+        self.assertEqual(index_state(self.db.index_filepath), before)
+
+    def test_reload_after_write(self):
+        """검색 연결을 연 뒤 add_many로 추가한 행이 다음 검색에 보이는지 확인함"""
+        self.assertNotEqual(self.db.search("new", k=1)[0][0], "cnew")
+        self.assertNotEqual(asyncio.run(self.db.asearch("new", k=1))[0][0], "cnew")
+        self.db.add_many(["new"], ["cnew"])
+        self.assertEqual(self.db.search("new", k=1)[0][0], "cnew")
+        self.assertEqual(asyncio.run(self.db.asearch("new", k=1))[0][0], "cnew")
+
+    def test_snapshot_dirs_removed(self):
+        """사본을 메모리에 로드한 뒤 임시 디렉토리를 삭제하는지 확인함"""
+        self.db.search("q1", k=1)
+        asyncio.run(self.db.asearch("q1", k=1))
+        self.assertEqual(len(self.snapshot_dirs), 2)
+        for path in self.snapshot_dirs:
+            self.assertFalse(os.path.exists(path))
+
+    def test_unexpected_ddl(self):
+        """vectors 테이블 정의에서 인덱스 경로를 바꾸지 못하면 원본을 열지 않고 ValueError를 발생시키는지 확인함"""
+        path = os.path.join(self.dir, "plain.db")
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE vectors(embedding BLOB)")
+        db.close()
+        plain = HNSWVecDB(path, embedding_size=DIM, embedding_function=fake_embed)
+        with self.assertRaises(ValueError):
+            plain._snapshot_index()
+        for path in self.snapshot_dirs:
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()